@@ -9,7 +9,7 @@ import re
 
 from app.core.config import processing_mode, settings
 from app.services.single_run_processor import SingleRunProcessor
-from app.services.batch_processor import BatchProcessor
+from app.services.batch_processor import batch_processor
 from app.services.full_processor import FullProcessor
 from app.services.rule_only_processor import rule_only_processor
 from app.services.monitoring import metrics_collector, alert_manager
@@ -43,7 +43,6 @@ router = APIRouter()
 
 # 서비스 인스턴스
 single_processor = SingleRunProcessor()
-batch_processor = BatchProcessor()
 full_processor = FullProcessor()
 
 
@@ -435,8 +434,6 @@ async def start_batch_improvement(
 async def get_batch_status(job_id: str):
     """배치 작업 상태 조회"""
     try:
-        from app.services.batch_processor import batch_processor
-        
         job_status = batch_processor.get_job_status(job_id)
         
         if not job_status:
@@ -1843,8 +1840,6 @@ async def get_dsl_versions():
 async def get_batch_stats():
     """배치 처리 통계 조회"""
     try:
-        from app.services.batch_processor import batch_processor
-        
         stats = batch_processor.get_batch_stats()
         
         return {
@@ -1865,8 +1860,6 @@ async def get_batch_stats():
 async def get_batch_history(limit: int = 10):
     """배치 처리 이력 조회"""
     try:
-        from app.services.batch_processor import batch_processor
-        
         history = batch_processor.get_job_history(limit)
         
         return history
@@ -1879,8 +1872,6 @@ async def get_batch_history(limit: int = 10):
 async def start_batch_processing(settings: dict):
     """배치 처리 시작"""
     try:
-        from app.services.batch_processor import batch_processor
-        
         print(f"🚀 DEBUG: 배치 처리 시작 요청 - 설정: {settings}")
         logger.info(f"배치 처리 시작 요청 - 설정: {settings}")
         
@@ -1904,8 +1895,6 @@ async def start_batch_processing(settings: dict):
 async def stop_batch_processing(job_id: str):
     """배치 처리 중지"""
     try:
-        from app.services.batch_processor import batch_processor
-        
         print(f"⏹️ DEBUG: 배치 처리 중지 요청 - ID: {job_id}")
         logger.info(f"배치 처리 중지 요청: {job_id}")
         
@@ -1956,6 +1945,7 @@ async def update_default_rules():
         
         # 모든 규칙 삭제
         dsl_manager.rules.clear()
+        dsl_manager.invalidate_rule_index()
         
         # 새로운 개선된 기본 규칙 생성
         dsl_manager._create_default_rules()
@@ -2,6 +2,7 @@
 환경 설정 및 토글 시스템
 """
 import os
+from functools import cached_property
 from typing import Optional, Dict, Any
 from pydantic_settings import BaseSettings
 from pydantic import Field
@@ -10,8 +11,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 
-class Settings(BaseSettings):
-    """애플리케이션 설정"""
+class _SettingsGroup(BaseSettings):
+    """설정 그룹 공통 베이스 (다른 그룹의 환경 변수는 무시)"""
+    
+    class Config:
+        env_file = ".env"
+        case_sensitive = False
+        extra = "ignore"
+
+
+class CoreSettings(_SettingsGroup):
+    """환경, 처리 모드 토글, 안전 장치, 로깅"""
     
     # Environment
     environment: str = Field(default="development", env="ENVIRONMENT")
@@ -22,42 +32,98 @@ class Settings(BaseSettings):
     auto_advance: bool = Field(default=False, env="AUTO_ADVANCE")
     use_batch_api: bool = Field(default=False, env="USE_BATCH_API")
     
-    # Quality Gates (합격선)
+    # Safety Settings
+    max_auto_patch_attempts: int = Field(default=3, env="MAX_AUTO_PATCH_ATTEMPTS")
+    oscillation_prevention: bool = Field(default=True, env="OSCILLATION_PREVENTION")
+    auto_rollback: bool = Field(default=True, env="AUTO_ROLLBACK")
+    whitelist_dsl_only: bool = Field(default=True, env="WHITELIST_DSL_ONLY")
+    
+    # Logging
+    log_level: str = Field(default="INFO", env="LOG_LEVEL")
+    log_file: str = Field(default="logs/app.log", env="LOG_FILE")
+    
+    # Render 특정 설정
+    port: int = Field(default=8000, env="PORT")
+
+
+class QualityGateSettings(_SettingsGroup):
+    """품질 게이트 (합격선)"""
+    
     min_nrr: float = Field(default=0.92, env="MIN_NRR")
     min_fpr: float = Field(default=0.985, env="MIN_FPR")
     min_ss: float = Field(default=0.90, env="MIN_SS")
     min_token_reduction: float = Field(default=20.0, env="MIN_TOKEN_REDUCTION")
+
+
+class DBSettings(_SettingsGroup):
+    """데이터베이스 - Render 환경에서는 환경 변수로 자동 설정됨"""
     
-    # Database - Render 환경에서는 환경 변수로 자동 설정됨
     mongodb_url: str = Field(default="mongodb://localhost:27017", env="MONGODB_URL")
     mongodb_db: str = Field(default="legal_db", env="MONGODB_DB")
     redis_url: str = Field(default="redis://localhost:6379", env="REDIS_URL")
+
+
+class OpenAISettings(_SettingsGroup):
+    """OpenAI API"""
     
-    # OpenAI API
     openai_api_key: str = Field(default="", env="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4-turbo-preview", env="OPENAI_MODEL")
+
+
+class BatchSettings(_SettingsGroup):
+    """배치 처리"""
     
-    # Batch Processing
     max_batch_size: int = Field(default=1000, env="MAX_BATCH_SIZE")
     batch_timeout_seconds: int = Field(default=3600, env="BATCH_TIMEOUT_SECONDS")
     max_concurrent_batches: int = Field(default=5, env="MAX_CONCURRENT_BATCHES")
+
+
+# 필드명 -> 설정 그룹 속성명 (settings.mongodb_url 같은 기존 평면 접근 유지용)
+_FIELD_GROUPS: Dict[str, str] = {
+    field_name: group_name
+    for group_name, group_cls in (
+        ("core", CoreSettings),
+        ("quality", QualityGateSettings),
+        ("db", DBSettings),
+        ("openai", OpenAISettings),
+        ("batch", BatchSettings),
+    )
+    for field_name in group_cls.model_fields
+}
+
+
+class Settings:
+    """애플리케이션 설정
     
-    # Safety Settings
-    max_auto_patch_attempts: int = Field(default=3, env="MAX_AUTO_PATCH_ATTEMPTS")
-    oscillation_prevention: bool = Field(default=True, env="OSCILLATION_PREVENTION")
-    auto_rollback: bool = Field(default=True, env="AUTO_ROLLBACK")
-    whitelist_dsl_only: bool = Field(default=True, env="WHITELIST_DSL_ONLY")
+    그룹별 설정은 처음 접근할 때 환경 변수를 읽고 검증한다.
+    (예: OpenAI 키를 쓰지 않는 프로세스는 OpenAISettings를 만들지 않음)
+    """
     
-    # Logging
-    log_level: str = Field(default="INFO", env="LOG_LEVEL")
-    log_file: str = Field(default="logs/app.log", env="LOG_FILE")
+    @cached_property
+    def core(self) -> CoreSettings:
+        return CoreSettings()
     
-    # Render 특정 설정
-    port: int = Field(default=8000, env="PORT")
+    @cached_property
+    def quality(self) -> QualityGateSettings:
+        return QualityGateSettings()
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+    @cached_property
+    def db(self) -> DBSettings:
+        return DBSettings()
+    
+    @cached_property
+    def openai(self) -> OpenAISettings:
+        return OpenAISettings()
+    
+    @cached_property
+    def batch(self) -> BatchSettings:
+        return BatchSettings()
+    
+    def __getattr__(self, name: str) -> Any:
+        group_name = _FIELD_GROUPS.get(name)
+        if group_name is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+        return getattr(getattr(self, group_name), name)
     
     def is_production(self) -> bool:
         """프로덕션 환경인지 확인"""
@@ -78,6 +144,13 @@ class ProcessingMode:
     
     def __init__(self, settings: Settings):
         self.settings = settings
+        self._mode_name: Optional[str] = None
+        self._mode_config: Optional[Dict[str, Any]] = None
+    
+    def invalidate(self):
+        """런타임에 모드 토글이 바뀐 경우 캐시된 모드 정보 초기화"""
+        self._mode_name = None
+        self._mode_config = None
     
     def is_single_run_mode(self) -> bool:
         """단건 점검 모드인지 확인"""
@@ -93,28 +166,32 @@ class ProcessingMode:
     
     def get_mode_name(self) -> str:
         """현재 모드명 반환"""
-        if self.is_single_run_mode():
-            return "단건 점검 모드 (Shakedown)"
-        elif self.is_batch_mode():
-            return "Batch API 반복 개선"
-        else:
-            return "전량 처리 모드"
+        if self._mode_name is None:
+            if self.is_single_run_mode():
+                self._mode_name = "단건 점검 모드 (Shakedown)"
+            elif self.is_batch_mode():
+                self._mode_name = "Batch API 반복 개선"
+            else:
+                self._mode_name = "전량 처리 모드"
+        return self._mode_name
     
     def get_mode_config(self) -> Dict[str, Any]:
-        """현재 모드 설정 반환"""
-        return {
-            "mode": self.get_mode_name(),
-            "single_run_mode": self.settings.single_run_mode,
-            "auto_patch": self.settings.auto_patch,
-            "auto_advance": self.settings.auto_advance,
-            "use_batch_api": self.settings.use_batch_api,
-            "quality_gates": {
-                "min_nrr": self.settings.min_nrr,
-                "min_fpr": self.settings.min_fpr,
-                "min_ss": self.settings.min_ss,
-                "min_token_reduction": self.settings.min_token_reduction
+        """현재 모드 설정 반환 (캐시된 딕셔너리이므로 읽기 전용으로 사용)"""
+        if self._mode_config is None:
+            self._mode_config = {
+                "mode": self.get_mode_name(),
+                "single_run_mode": self.settings.single_run_mode,
+                "auto_patch": self.settings.auto_patch,
+                "auto_advance": self.settings.auto_advance,
+                "use_batch_api": self.settings.use_batch_api,
+                "quality_gates": {
+                    "min_nrr": self.settings.min_nrr,
+                    "min_fpr": self.settings.min_fpr,
+                    "min_ss": self.settings.min_ss,
+                    "min_token_reduction": self.settings.min_token_reduction
+                }
             }
-        }
+        return self._mode_config
 
 
 class QualityGates:
@@ -2,7 +2,12 @@
 데이터베이스 연결 및 관리
 """
 import asyncio
-from typing import Optional, Dict, List, Any
+import copy
+import time
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Tuple
+import orjson
+from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
 import redis.asyncio as redis
 from app.core.config import settings
@@ -10,6 +15,52 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 평가 캐시 키 포매터 (호출마다 f-string을 파싱하지 않도록 미리 바인딩)
+_EVAL_CACHE_KEY = "eval:{}:{}".format
+
+# 캐시 직렬화 옵션: datetime/UUID/dataclass/numpy는 orjson이 C에서 직접 처리
+# (datetime.now()로 만든 naive 로컬 시각은 오프셋 없이 그대로 직렬화)
+_ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson이 직접 처리하지 못하는 타입(ObjectId, Decimal 등)은 문자열로 변환"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps_json(data: Any) -> bytes:
+    """캐시 저장용 JSON 직렬화"""
+    return orjson.dumps(data, default=_json_default, option=_ORJSON_OPTIONS)
+
+
+_HEX_DIGITS = frozenset("0123456789abcdefABCDEF")
+
+
+def _is_object_id(value: str) -> bool:
+    """24자리 16진수 문자열인지 확인 (ObjectId.is_valid보다 가벼운 검사)"""
+    return len(value) == 24 and _HEX_DIGITS.issuperset(value)
+
+
+def _allocate_strata(sizes: List[int], limit: int) -> List[int]:
+    """층별 표본 수 배분 - 층 크기에 비례 (최대 잔여 방식), 층 크기를 넘지 않고 합계는 min(limit, 전체 크기)"""
+    total = sum(sizes)
+    target = min(limit, total)
+    if target <= 0:
+        return [0] * len(sizes)
+    
+    shares = [target * size / total for size in sizes]
+    allocation = [int(share) for share in shares]
+    # 정수 몫을 나누고 남은 표본은 소수부가 큰 층부터 1개씩
+    leftover = target - sum(allocation)
+    by_remainder = sorted(range(len(sizes)), key=lambda i: shares[i] - allocation[i], reverse=True)
+    for i in by_remainder[:leftover]:
+        allocation[i] += 1
+    return allocation
+
 
 class DatabaseManager:
     """데이터베이스 관리자"""
@@ -18,9 +69,11 @@ class DatabaseManager:
         self.mongo_client: Optional[AsyncIOMotorClient] = None
         self.mongo_db: Optional[AsyncIOMotorDatabase] = None
         self.redis_client: Optional[redis.Redis] = None
+        self._collections: Dict[str, AsyncIOMotorCollection] = {}  # 컬렉션 핸들 캐시
     
     async def connect(self):
         """데이터베이스 연결"""
+        self._collections.clear()
         try:
             # MongoDB 연결 (선택사항)
             max_retries = 3
@@ -34,10 +87,11 @@ class DatabaseManager:
                         serverSelectionTimeoutMS=30000,  # 30초로 증가
                         connectTimeoutMS=30000,
                         socketTimeoutMS=30000,
-                        maxPoolSize=50,  # 연결 풀 크기 증가
-                        minPoolSize=10,
-                        maxIdleTimeMS=45000,  # 유휴 연결 시간
+                        maxPoolSize=max(50, settings.max_concurrent_batches * 10),  # 배치 동시성에 맞춘 풀 크기
+                        minPoolSize=10,  # 첫 요청 핸드셰이크 지연 방지
+                        maxIdleTimeMS=60000,  # 유휴 연결 시간
                         waitQueueTimeoutMS=30000,  # 대기열 타임아웃
+                        compressors="zstd,snappy,zlib",  # 설치되지 않은 압축기는 pymongo가 건너뜀
                         retryWrites=True  # 재시도 활성화
                     )
                     self.mongo_db = self.mongo_client[settings.mongodb_db]
@@ -60,6 +114,9 @@ class DatabaseManager:
                     
                 except Exception as e:
                     logger.warning(f"MongoDB connection attempt {attempt + 1} failed: {e}")
+                    # 실패한 시도의 클라이언트는 다음 시도 전에 정리
+                    if self.mongo_client is not None:
+                        self.mongo_client.close()
                     if attempt == max_retries - 1:
                         logger.error(f"All MongoDB connection attempts failed. Final error: {e}")
                         logger.error(f"MongoDB URL: {settings.mongodb_url}")
@@ -69,6 +126,13 @@ class DatabaseManager:
                         # 재시도 전 대기
                         await asyncio.sleep(2 ** attempt)  # 지수 백오프
             
+            # 최신 규칙 버전 조회(sort + limit)가 인덱스를 타도록 보장 (실패해도 연결은 유지)
+            if self.mongo_db is not None:
+                try:
+                    await self.mongo_db.rules_versions.create_index([("created_at", -1)])
+                except Exception as e:
+                    logger.warning(f"rules_versions index creation failed: {e}")
+            
             # Redis 연결 (선택사항)
             try:
                 self.redis_client = redis.from_url(settings.redis_url, socket_connect_timeout=5)
@@ -89,6 +153,7 @@ class DatabaseManager:
     
     async def disconnect(self):
         """데이터베이스 연결 해제"""
+        self._collections.clear()
         if self.mongo_client:
             self.mongo_client.close()
         
@@ -102,7 +167,12 @@ class DatabaseManager:
         if self.mongo_db is None:
             logger.warning("MongoDB not available, returning None")
             return None
-        return self.mongo_db[collection_name]
+        # 컬렉션 프록시는 최초 접근 시 한 번만 생성
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            collection = self.mongo_db[collection_name]
+            self._collections[collection_name] = collection
+        return collection
     
     async def get_redis(self) -> Optional[redis.Redis]:
         """Redis 클라이언트 반환"""
@@ -123,11 +193,9 @@ class DocumentRepository:
         """원본 케이스 조회 (읽기 전용)"""
         collection = self.db_manager.get_collection(self.collection_name)
         if collection:
-            from bson import ObjectId
-            # ObjectId로 조회 시도
-            if ObjectId.is_valid(case_id):
+            # ObjectId 형식이면 _id로, 아니면 precedent_id로 한 번만 조회
+            if _is_object_id(case_id):
                 return await collection.find_one({"_id": ObjectId(case_id)})
-            # precedent_id로 조회 시도
             return await collection.find_one({"precedent_id": case_id})
         return None
     
@@ -145,28 +213,45 @@ class DocumentRepository:
         
         # 층화 기준에 따른 파이프라인 구성
         pipeline = []
-        
+
         if criteria:
             pipeline.append({"$match": criteria})
-        
-        # 층화를 위한 그룹핑
+
+        # 층화: 층 키와 층 크기만 먼저 조회한 뒤 층별 $sample ($push $$ROOT로 문서 전체를 모으지 않음)
         if "court_type" in criteria or "case_type" in criteria:
-            pipeline.extend([
+            strata_cursor = collection.aggregate(pipeline + [
                 {"$group": {
                     "_id": {
                         "court_type": "$court_type",
                         "case_type": "$case_type",
                         "year": "$year"
                     },
-                    "docs": {"$push": "$$ROOT"}
-                }},
-                {"$project": {
-                    "docs": {"$slice": ["$docs", limit // 10]}  # 각 그룹에서 일정 수만 선택
-                }},
-                {"$unwind": "$docs"},
-                {"$replaceRoot": {"newRoot": "$docs"}},
-                {"$limit": limit}
+                    "count": {"$sum": 1}
+                }}
             ])
+            strata = await strata_cursor.to_list(length=None)
+            if not strata:
+                return []
+
+            # 층 크기에 비례 배분 (작은 층이 몫을 채우지 못해 표본이 모자라는 일 없음) - 배분이 0인 층은 조회하지 않음
+            # 층마다 $match(인덱스 사용 가능) + $sample을 따로 실행해 동시에 조회
+            # ($facet은 결과 전체가 16MB 단일 문서로 묶이고 하위 $match가 인덱스를 타지 못함)
+            allocation = _allocate_strata([stratum["count"] for stratum in strata], limit)
+            stratum_queries = []
+            for stratum, per_stratum in zip(strata, allocation):
+                if not per_stratum:
+                    continue
+                stratum_filter = {
+                    **criteria,
+                    **{field: stratum["_id"].get(field) for field in ("court_type", "case_type", "year")}
+                }
+                stratum_queries.append(collection.aggregate([
+                    {"$match": stratum_filter},
+                    {"$sample": {"size": per_stratum}}
+                ]).to_list(length=per_stratum))
+            
+            samples = await asyncio.gather(*stratum_queries)
+            return [document for sample in samples for document in sample]
         else:
             pipeline.append({"$sample": {"size": limit}})
         
@@ -225,7 +310,6 @@ class ProcessedPrecedentRepository:
         """전처리된 케이스 업데이트"""
         collection = self.db_manager.get_collection(self.collection_name)
         if collection:
-            from bson import ObjectId
             result = await collection.update_one(
                 {"_id": ObjectId(processed_id)},
                 {"$set": {**update_data, "updated_at": datetime.now()}}
@@ -254,16 +338,19 @@ class ProcessedPrecedentRepository:
             cursor = collection.aggregate(pipeline)
             results = await cursor.to_list(length=None)
             
-            stats = {"total": 0, "by_status": {}}
+            # $group 결과에는 항상 모든 필드가 존재 ($avg는 값이 없으면 null)
+            by_status = {}
+            total = 0
             for result in results:
-                stats["by_status"][result["_id"]] = {
-                    "count": result["count"],
-                    "avg_quality_score": result.get("avg_quality_score", 0),
-                    "avg_token_reduction": result.get("avg_token_reduction", 0)
+                count = result["count"]
+                by_status[result["_id"]] = {
+                    "count": count,
+                    "avg_quality_score": result["avg_quality_score"] or 0,
+                    "avg_token_reduction": result["avg_token_reduction"] or 0
                 }
-                stats["total"] += result["count"]
-            
-            return stats
+                total += count
+
+            return {"total": total, "by_status": by_status}
         return {"total": 0, "by_status": {}}
 
 
@@ -309,25 +396,41 @@ class ProcessingResultRepository:
 class RulesRepository:
     """규칙 저장소"""
     
-    def __init__(self, db_manager: DatabaseManager):
+    def __init__(self, db_manager: DatabaseManager, latest_ttl_seconds: float = 30.0):
         self.db_manager = db_manager
         self.collection_name = "rules_versions"
+        # 규칙 버전은 추가만 되므로 버전별 조회 결과는 변하지 않음
+        self._version_cache: Dict[str, Dict[str, Any]] = {}
+        self._latest_cache: Optional[Tuple[float, Optional[Dict[str, Any]]]] = None
+        self.latest_ttl_seconds = latest_ttl_seconds
     
     async def save_version(self, version_data: Dict[str, Any]) -> str:
         """규칙 버전 저장"""
         collection = self.db_manager.get_collection(self.collection_name)
         result = await collection.insert_one(version_data)
+        self._latest_cache = None  # 최신 버전이 바뀌었으므로 무효화
+        self._version_cache.pop(version_data.get("version"), None)
         return str(result.inserted_id)
     
     async def get_latest_version(self) -> Optional[Dict[str, Any]]:
-        """최신 버전 조회"""
-        collection = self.db_manager.get_collection(self.collection_name)
-        return await collection.find_one(sort=[("created_at", -1)])
+        """최신 버전 조회 (짧은 TTL 캐시, 호출자가 수정해도 캐시에 영향 없도록 사본 반환)"""
+        now = time.monotonic()
+        if self._latest_cache is None or now - self._latest_cache[0] >= self.latest_ttl_seconds:
+            collection = self.db_manager.get_collection(self.collection_name)
+            latest = await collection.find_one(sort=[("created_at", -1)])
+            self._latest_cache = (now, latest)
+        return copy.deepcopy(self._latest_cache[1])
     
     async def get_version(self, version: str) -> Optional[Dict[str, Any]]:
-        """특정 버전 조회"""
-        collection = self.db_manager.get_collection(self.collection_name)
-        return await collection.find_one({"version": version})
+        """특정 버전 조회 (호출자가 수정해도 캐시에 영향 없도록 사본 반환)"""
+        version_data = self._version_cache.get(version)
+        if version_data is None:
+            collection = self.db_manager.get_collection(self.collection_name)
+            version_data = await collection.find_one({"version": version})
+            if version_data is None:
+                return None
+            self._version_cache[version] = version_data
+        return copy.deepcopy(version_data)
 
 
 class CacheManager:
@@ -339,28 +442,35 @@ class CacheManager:
     async def get_evaluation_cache(self, case_id: str, rules_version: str) -> Optional[Dict[str, Any]]:
         """평가 캐시 조회"""
         redis_client = await self.db_manager.get_redis()
-        cache_key = f"eval:{case_id}:{rules_version}"
+        cache_key = _EVAL_CACHE_KEY(case_id, rules_version)
         
         cached_data = await redis_client.get(cache_key)
         if cached_data:
-            import json
-            return json.loads(cached_data)
+            return orjson.loads(cached_data)
         return None
     
     async def set_evaluation_cache(self, case_id: str, rules_version: str, result: Dict[str, Any], ttl: int = 3600):
         """평가 캐시 저장"""
         redis_client = await self.db_manager.get_redis()
-        cache_key = f"eval:{case_id}:{rules_version}"
+        cache_key = _EVAL_CACHE_KEY(case_id, rules_version)
         
-        import json
-        await redis_client.setex(cache_key, ttl, json.dumps(result, default=str))
+        await redis_client.setex(cache_key, ttl, dumps_json(result))
     
     async def invalidate_cache_pattern(self, pattern: str):
         """패턴 기반 캐시 무효화"""
         redis_client = await self.db_manager.get_redis()
-        keys = await redis_client.keys(pattern)
-        if keys:
-            await redis_client.delete(*keys)
+        if redis_client is None:
+            return
+
+        # KEYS는 전체 키 공간을 블로킹 순회하므로 SCAN + UNLINK(비동기 해제)로 나눠 처리
+        batch = []
+        async for key in redis_client.scan_iter(match=pattern, count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await redis_client.unlink(*batch)
+                batch.clear()
+        if batch:
+            await redis_client.unlink(*batch)
 
 
 # 글로벌 인스턴스
@@ -3,38 +3,204 @@
 """
 import logging
 import logging.handlers
-from datetime import datetime
-from typing import Dict, Any, Optional
-import json
+import atexit
+import copy
+import functools
 import os
+import queue
+import socket
+import time
+from datetime import datetime
+from typing import List
 from pathlib import Path
 
+import orjson
+
 from app.core.config import settings
 
 
+@functools.lru_cache(maxsize=1024)
+def _format_log_second(second: int) -> str:
+    """초 단위 ISO 타임스탬프 (같은 초의 레코드끼리 재사용)"""
+    return datetime.fromtimestamp(second).strftime("%Y-%m-%dT%H:%M:%S")
+
+
 class JSONFormatter(logging.Formatter):
     """JSON 형식 로그 포매터"""
     
+    SERVICE_NAME = "document-processing-pipeline"
+    # 접두부에 미리 직렬화해 두는 필드 (추가 필드와 겹치면 중복 키가 생기므로 이름을 바꿔 기록)
+    PREFIX_FIELDS = frozenset(("service", "pid", "host"))
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 프로세스 내내 변하지 않는 필드는 한 번만 직렬화해 두고 앞에 붙임 ('{...,' 형태)
+        self._prefix = orjson.dumps({
+            "service": self.SERVICE_NAME,
+            "pid": os.getpid(),
+            "host": socket.gethostname()
+        })[:-1] + b","
+    
     def format(self, record: logging.LogRecord) -> str:
+        # 같은 레코드를 쓰는 다른 포매터가 다시 계산하지 않도록 record에 보관
+        record.message = record.getMessage()
         log_entry = {
-            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
+            "timestamp": "%s.%03d" % (_format_log_second(int(record.created)), record.msecs),
             "level": record.levelname,
             "logger": record.name,
-            "message": record.getMessage(),
+            "message": record.message,
             "module": record.module,
             "function": record.funcName,
             "line": record.lineno
         }
         
-        # 추가 필드가 있으면 포함
+        # 추가 필드가 있으면 포함 (접두부 필드와 겹치는 키는 extra_ 접두사를 붙임)
         if hasattr(record, 'extra_fields'):
-            log_entry.update(record.extra_fields)
+            extra_fields = record.extra_fields
+            if not self.PREFIX_FIELDS.isdisjoint(extra_fields):
+                extra_fields = {
+                    f"extra_{key}" if key in self.PREFIX_FIELDS else key: value
+                    for key, value in extra_fields.items()
+                }
+            log_entry.update(extra_fields)
         
         # 예외 정보가 있으면 포함
         if record.exc_info:
-            log_entry["exception"] = self.formatException(record.exc_info)
+            if not record.exc_text:
+                record.exc_text = self.formatException(record.exc_info)
+            log_entry["exception"] = record.exc_text
         
-        return json.dumps(log_entry, ensure_ascii=False)
+        # orjson은 UTF-8을 그대로 유지하며 직렬화함 - 가변 필드만 직렬화해 '{'를 떼고 접두부에 연결
+        body = orjson.dumps(
+            log_entry,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+        )
+        return (self._prefix + body[1:]).decode("utf-8")
+
+
+# 로그 파일 경로 (디렉토리는 setup_logging에서 한 번만 생성)
+LOG_FILE = Path(settings.log_file)
+
+# 파일 핸들러 쓰기 버퍼 크기와 주기적 flush 간격
+_LOG_BUFFER_SIZE = 64 * 1024
+_LOG_FLUSH_INTERVAL = 0.2
+
+# 리스너가 처리하지 못하고 큐에 쌓일 수 있는 최대 레코드 수 (초과분은 폐기)
+_MAX_PENDING_RECORDS = 10000
+
+# 백그라운드 스레드에서 실제 핸들러를 실행하는 리스너 목록
+_queue_listeners: List[logging.handlers.QueueListener] = []
+
+
+class _DroppingQueueHandler(logging.handlers.QueueHandler):
+    """대기 레코드가 한도를 넘으면 버리는 큐 핸들러 (버린 개수는 큐에 여유가 생기면 경고로 기록)"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.dropped_records = 0
+    
+    def enqueue(self, record: logging.LogRecord):
+        # handle()이 핸들러 락을 잡은 채 호출하므로 카운터 갱신은 직렬화됨
+        if self.queue.qsize() >= _MAX_PENDING_RECORDS:
+            self.dropped_records += 1
+            return
+        if self.dropped_records:
+            self.queue.put_nowait(self._dropped_warning(record))
+            self.dropped_records = 0
+        self.queue.put_nowait(record)
+    
+    def _dropped_warning(self, record: logging.LogRecord) -> logging.LogRecord:
+        """큐가 가득 차 버려진 레코드 수를 알리는 경고 레코드"""
+        return logging.LogRecord(
+            record.name, logging.WARNING, __file__, 0,
+            f"로그 큐가 가득 차 {self.dropped_records}개 레코드를 버렸습니다", None, None
+        )
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자만 호출 스레드에서 확정하고, 포맷팅은 리스너 스레드에 맡김
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class _BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """버퍼에 모아 쓰고 레코드마다 flush하지 않는 회전 파일 핸들러"""
+    
+    def __init__(self, *args, **kwargs):
+        self._last_flush = time.monotonic()
+        self._stream_bytes = 0  # 현재 파일 크기 (버퍼에 남은 바이트 포함)
+        self._record_bytes = 0  # 기록 중인 레코드의 바이트 수
+        super().__init__(*args, **kwargs)
+    
+    def _open(self):
+        stream = open(
+            self.baseFilename, self.mode, buffering=_LOG_BUFFER_SIZE,
+            encoding=self.encoding, errors=self.errors
+        )
+        # 일반 파일이 아니면(/dev/null 등) 회전하지 않음 - 레코드마다 stat하지 않도록 열 때 한 번만 확인
+        self._rotatable = os.path.isfile(self.baseFilename)
+        self._stream_bytes = os.path.getsize(self.baseFilename) if self._rotatable else 0
+        return stream
+    
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        # 기본 구현은 매번 seek(0, 2)로 크기를 재는데, 텍스트 스트림의 seek는 버퍼를 비워버림
+        # -> 기록한 바이트 수를 직접 세어 판단
+        if self.stream is None:
+            self.stream = self._open()
+        self._record_bytes = len(
+            (self.format(record) + self.terminator).encode(self.stream.encoding, "replace")
+        )
+        if self.maxBytes > 0 and self._rotatable:
+            return self._stream_bytes + self._record_bytes >= self.maxBytes
+        return False
+    
+    def emit(self, record: logging.LogRecord):
+        self._record_bytes = 0
+        super().emit(record)
+        # 회전했다면 _open()이 카운터를 새 파일 기준으로 초기화한 뒤 더해짐
+        self._stream_bytes += self._record_bytes
+    
+    def flush(self):
+        # emit()이 매번 호출하므로 간격이 지났을 때만 실제로 flush
+        now = time.monotonic()
+        if now - self._last_flush >= _LOG_FLUSH_INTERVAL:
+            self.force_flush()
+    
+    def force_flush(self):
+        """버퍼된 레코드를 즉시 디스크로 기록"""
+        self._last_flush = time.monotonic()
+        super().flush()
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """큐가 비는 시점에 버퍼된 핸들러를 flush하는 리스너"""
+    
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        if block and self.queue.empty():
+            self.flush_handlers()
+        return super().dequeue(block)
+    
+    def flush_handlers(self):
+        for handler in self.handlers:
+            getattr(handler, "force_flush", handler.flush)()
+
+
+def _level_method(level: int, doc: str):
+    """레벨별 CustomLogger 메서드 생성 - 비활성 레벨이면 kwargs 처리 전에 즉시 반환"""
+    
+    def log(self, message: str, *args, **kwargs):
+        logger = self.logger
+        # logger.disabled / logging.disable()도 isEnabledFor와 같이 확인
+        if level < self._effective_level or logger.disabled or logger.manager.disable >= level:
+            return
+        # stacklevel=2: 호출 위치(module/function/line)를 이 래퍼가 아닌 실제 호출자로 기록
+        logger._log(level, message, args, extra={"extra_fields": kwargs} if kwargs else None, stacklevel=2)
+    
+    log.__name__ = logging.getLevelName(level).lower()
+    log.__doc__ = doc
+    return log
 
 
 class CustomLogger:
@@ -43,62 +209,77 @@ class CustomLogger:
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
         self.logger.setLevel(getattr(logging, settings.log_level.upper()))
+        self.refresh_level()
         
         # 핸들러가 이미 추가되었는지 확인
         if not self.logger.handlers:
             self._setup_handlers()
     
+    def refresh_level(self):
+        """로그 레벨 재설정 후 호출 - 유효 레벨 스냅샷 갱신"""
+        self._effective_level = self.logger.getEffectiveLevel()
+    
     def _setup_handlers(self):
         """로그 핸들러 설정"""
         
         # 파일 핸들러
-        log_file = Path(settings.log_file)
-        log_file.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.handlers.RotatingFileHandler(
-            log_file,
+        file_handler = _BufferedRotatingFileHandler(
+            LOG_FILE,
             maxBytes=10 * 1024 * 1024,  # 10MB
             backupCount=5
         )
         file_handler.setFormatter(JSONFormatter())
-        self.logger.addHandler(file_handler)
+        handlers = [file_handler]
         
         # 콘솔 핸들러 (개발 환경에서만)
         if settings.environment == "development":
+            # 파일 핸들러와 같은 레코드를 리스너 스레드에서 공유하며, DEBUG는 콘솔 포맷 생략
             console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.INFO)
             console_formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+                '{asctime} - {name} - {levelname} - {message}', style='{'
             )
             console_handler.setFormatter(console_formatter)
-            self.logger.addHandler(console_handler)
-    
-    def info(self, message: str, **kwargs):
-        """정보 로그"""
-        extra = {"extra_fields": kwargs} if kwargs else {}
-        self.logger.info(message, extra=extra)
-    
-    def warning(self, message: str, **kwargs):
-        """경고 로그"""
-        extra = {"extra_fields": kwargs} if kwargs else {}
-        self.logger.warning(message, extra=extra)
-    
-    def error(self, message: str, **kwargs):
-        """오류 로그"""
-        extra = {"extra_fields": kwargs} if kwargs else {}
-        self.logger.error(message, extra=extra)
+            handlers.append(console_handler)
+        
+        # 호출 스레드(이벤트 루프)는 큐에 넣기만 하고 I/O는 리스너 스레드에서 수행
+        log_queue = queue.SimpleQueue()
+        self.logger.addHandler(_DroppingQueueHandler(log_queue))
+        
+        listener = _FlushingQueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        _queue_listeners.append(listener)
     
-    def debug(self, message: str, **kwargs):
-        """디버그 로그"""
-        extra = {"extra_fields": kwargs} if kwargs else {}
-        self.logger.debug(message, extra=extra)
+    info = _level_method(logging.INFO, "정보 로그")
+    warning = _level_method(logging.WARNING, "경고 로그")
+    error = _level_method(logging.ERROR, "오류 로그")
+    debug = _level_method(logging.DEBUG, "디버그 로그")
+
+
+def stop_logging():
+    """큐 리스너를 중지하고 남은 로그 레코드를 모두 디스크에 기록"""
+    while _queue_listeners:
+        listener = _queue_listeners.pop()
+        listener.stop()
+        listener.flush_handlers()
 
 
+atexit.register(stop_logging)
+
+
+@functools.lru_cache(maxsize=1)
 def setup_logging():
-    """로깅 시스템 초기화"""
+    """로깅 시스템 초기화 (최초 1회만 수행하고 이후 같은 로거 반환)"""
     
     # 로그 디렉토리 생성
-    log_dir = Path(settings.log_file).parent
-    log_dir.mkdir(parents=True, exist_ok=True)
+    LOG_FILE.parent.mkdir(parents=True, exist_ok=True)
+    
+    # LogRecord 생성 시 스레드/프로세스 정보 조회 생략 (호출 위치는 JSON 로그에 남기므로 유지)
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
     
     # 루트 로거 설정
     root_logger = logging.getLogger()
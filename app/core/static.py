@@ -0,0 +1,62 @@
+"""
+정적 파일 서빙 설정
+"""
+import mimetypes
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """빌드 시 만들어 둔 .gz 파일이 있으면 압축본을 그대로 전송하는 StaticFiles
+    
+    요청마다 압축하지 않고 디스크의 압축본을 보내므로 CPU 사용 없이 전송량만 줄어듦.
+    압축본이 없으면 기존 StaticFiles와 동일하게 동작.
+    """
+    
+    def file_response(
+        self,
+        full_path: str,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        
+        response = self._gzip_response(full_path, request_headers, status_code)
+        if response is None:
+            return super().file_response(full_path, stat_result, scope, status_code)
+        
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+    
+    def _gzip_response(
+        self,
+        full_path: str,
+        request_headers: Headers,
+        status_code: int
+    ) -> Optional[FileResponse]:
+        """gzip 압축본 응답 (클라이언트가 지원하지 않거나 압축본이 없으면 None)"""
+        if "gzip" not in request_headers.get("accept-encoding", ""):
+            return None
+        
+        gzip_path = f"{full_path}.gz"
+        try:
+            gzip_stat = os.stat(gzip_path)
+        except OSError:
+            return None
+        
+        # Content-Type은 원본 파일 기준으로 지정
+        media_type = mimetypes.guess_type(full_path)[0] or "text/plain"
+        return FileResponse(
+            gzip_path,
+            status_code=status_code,
+            media_type=media_type,
+            stat_result=gzip_stat,
+            headers={"content-encoding": "gzip", "vary": "Accept-Encoding"}
+        )
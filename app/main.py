@@ -2,33 +2,55 @@
 FastAPI 애플리케이션 메인 파일
 """
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, TemplateNotFound
 import uvicorn
-from pathlib import Path
 
 from app.core.config import settings
 from app.core.database import db_manager
-from app.core.logging import setup_logging
+from app.core.logging import logger, stop_logging
+from app.core.static import PrecompressedStaticFiles
 from app.api.endpoints import router
+from app.services.batch_processor import batch_processor
 from app.services.monitoring import metrics_collector, alert_manager
 
-# 로깅 설정
-logger = setup_logging()
-
 # FastAPI 애플리케이션 생성
 app = FastAPI(
     title="Document Processing Pipeline",
     description="법률 문서 전처리 파이프라인 API",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # 정적 파일 및 템플릿 설정
-app.mount("/static", StaticFiles(directory="app/ui/static"), name="static")
-templates = Jinja2Templates(directory="app/ui/templates")
+# 운영 환경에서는 빌드 단계에서 만든 .gz 압축본을 그대로 전송
+app.mount("/static", PrecompressedStaticFiles(directory="app/ui/static"), name="static")
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader("app/ui/templates"),
+    autoescape=True,
+    auto_reload=settings.environment == "development",
+    bytecode_cache=FileSystemBytecodeCache()
+))
+
+# 서버 측 데이터 없이 JS가 채우는 페이지 템플릿 (렌더링 결과를 재사용)
+PAGE_TEMPLATES = (
+    "index.html", "single_run.html", "batch.html",
+    "full_processing.html", "monitoring.html"
+)
+_page_cache = {}
+
+
+def render_page(name: str) -> HTMLResponse:
+    """정적 페이지 응답 (개발 환경 외에는 최초 렌더링 결과를 캐시)"""
+    body = _page_cache.get(name)
+    if body is None:
+        body = templates.get_template(name).render().encode("utf-8")
+        if not templates.env.auto_reload:
+            _page_cache[name] = body
+    return HTMLResponse(body)
 
 # API 라우터 등록
 app.include_router(router, prefix="/api")
@@ -37,41 +59,47 @@ app.include_router(router, prefix="/api")
 @app.on_event("startup")
 async def startup_event():
     """애플리케이션 시작 이벤트"""
-    logger.info("Starting Document Processing Pipeline")
     
-    # 환경 변수 확인
-    logger.info(f"Environment: {settings.environment}")
-    logger.info(f"MongoDB URL set: {'Yes' if settings.mongodb_url else 'No'}")
-    logger.info(f"MongoDB DB: {settings.mongodb_db}")
-    logger.info(f"Redis URL set: {'Yes' if settings.redis_url else 'No'}")
+    # 페이지 템플릿 미리 렌더링
+    for name in PAGE_TEMPLATES:
+        try:
+            render_page(name)
+        except TemplateNotFound:
+            logger.warning("Template not found: %s", name)
+    
+    # 시작 정보는 하나의 구조화된 이벤트로 기록
+    startup_ctx = {
+        "environment": settings.environment,
+        "mongodb_url_set": bool(settings.mongodb_url),
+        "mongodb_db": settings.mongodb_db,
+        "redis_url_set": bool(settings.redis_url)
+    }
     
     try:
         # 데이터베이스 연결
         await db_manager.connect()
-        logger.info("Database connection attempt completed")
         
         # 모니터링 시작
         await metrics_collector.start_collecting()
         await alert_manager.start_monitoring()
-        logger.info("Monitoring started successfully")
-        
-        logger.info("Application startup completed")
         
         # DSL 규칙 시스템 자동 초기화 (MongoDB)
         try:
             from app.services.dsl_rules import dsl_manager
-            logger.info("🔧 DSL 규칙 시스템 MongoDB 초기화 중...")
             
             # DSL 매니저는 자동으로 MongoDB에서 로드하거나 기본 규칙 생성
             performance_report = dsl_manager.get_performance_report()
-            logger.info(f"✅ DSL 규칙 시스템 MongoDB 준비 완료: {performance_report['total_rules']}개 규칙")
+            startup_ctx["dsl_rules"] = performance_report['total_rules']
                 
         except Exception as e:
-            logger.error(f"❌ DSL 규칙 시스템 초기화 실패: {e}")
+            logger.error("❌ DSL 규칙 시스템 초기화 실패: %s", e)
             logger.warning("⚠️ 기본 전처리 시스템으로 계속 진행...")
+            startup_ctx["dsl_rules"] = None
+        
+        logger.info("startup_completed", **startup_ctx)
         
     except Exception as e:
-        logger.error(f"Failed to start application: {e}")
+        logger.error("Failed to start application: %s", e, **startup_ctx)
         raise
 
 
@@ -85,44 +113,51 @@ async def shutdown_event():
         await metrics_collector.stop_collecting()
         await alert_manager.stop_monitoring()
         
+        # 배치 처리기 OpenAI 연결 풀 종료
+        await batch_processor.aclose()
+        
         # 데이터베이스 연결 해제
         await db_manager.disconnect()
         
         logger.info("Application shutdown completed")
         
     except Exception as e:
-        logger.error(f"Error during shutdown: {e}")
+        logger.error("Error during shutdown: %s", e)
+    
+    finally:
+        # 큐에 남은 로그를 모두 기록한 뒤 리스너 종료
+        stop_logging()
 
 
 # 웹 UI 라우트
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """메인 페이지"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return render_page("index.html")
 
 
 @app.get("/single-run", response_class=HTMLResponse)
 async def single_run_page(request: Request):
     """단건 점검 페이지"""
-    return templates.TemplateResponse("single_run.html", {"request": request})
+    return render_page("single_run.html")
 
 
 @app.get("/batch", response_class=HTMLResponse)
 async def batch_page(request: Request):
     """배치 개선 페이지"""
-    return templates.TemplateResponse("batch.html", {"request": request})
+    return render_page("batch.html")
 
 
 @app.get("/full-processing", response_class=HTMLResponse)
 async def full_processing_page(request: Request):
     """전량 처리 페이지"""
-    return templates.TemplateResponse("full_processing.html", {"request": request})
+    return render_page("full_processing.html")
 
 
 @app.get("/monitoring", response_class=HTMLResponse)
 async def monitoring_page(request: Request):
     """모니터링 페이지"""
-    return templates.TemplateResponse("monitoring.html", {"request": request})
+    return render_page("monitoring.html")
 
 
 if __name__ == "__main__":
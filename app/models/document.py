@@ -2,8 +2,8 @@
 문서 처리 관련 데이터 모델
 """
 from datetime import datetime
-from typing import Optional, Dict, List, Any
-from pydantic import BaseModel, Field
+from typing import Optional, Dict, List, Any, Literal
+from pydantic import BaseModel, ConfigDict, Field
 from enum import Enum
 
 
@@ -23,8 +23,15 @@ class ProcessingMode(str, Enum):
     FULL_PROCESSING = "full_processing"
 
 
+# 모델 필드용 리터럴 타입 (Enum 멤버 조회 대신 문자열 집합 검사로 검증)
+ProcessingStatusValue = Literal["pending", "in_progress", "completed", "failed", "cancelled"]
+ProcessingModeValue = Literal["single_run", "batch_improvement", "full_processing"]
+
+
 class QualityMetrics(BaseModel):
     """품질 지표"""
+    model_config = ConfigDict(frozen=True, use_enum_values=True)
+    
     nrr: float = Field(description="Noise Reduction Rate")
     fpr: float = Field(description="False Positive Rate")
     ss: float = Field(description="Semantic Similarity")
@@ -41,13 +48,15 @@ class DocumentCase(BaseModel):
     format_type: str = Field(description="포맷 유형")
     original_content: str = Field(description="원본 내용")
     processed_content: Optional[str] = Field(default=None, description="처리된 내용")
-    status: ProcessingStatus = Field(default=ProcessingStatus.PENDING)
+    status: ProcessingStatusValue = Field(default="pending")
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
 
 
 class ProcessedPrecedent(BaseModel):
     """전처리된 판례 데이터"""
+    model_config = ConfigDict(frozen=True, use_enum_values=True)
+    
     original_id: str = Field(description="원본 processed_precedents의 _id")
     precedent_id: str = Field(description="판례 ID")
     case_name: str = Field(description="사건명")
@@ -78,6 +87,8 @@ class ProcessedPrecedent(BaseModel):
 
 class ProcessingResult(BaseModel):
     """처리 결과 (메트릭 및 분석용)"""
+    model_config = ConfigDict(frozen=True, use_enum_values=True)
+    
     case_id: str
     original_id: str = Field(description="원본 processed_precedents의 _id")
     rules_version: str = Field(description="사용된 규칙 버전")
@@ -108,11 +119,11 @@ class RulePatch(BaseModel):
 class BatchJob(BaseModel):
     """배치 작업"""
     job_id: str
-    mode: ProcessingMode
+    mode: ProcessingModeValue
     sample_size: int
     stratification_criteria: Dict[str, Any] = Field(description="층화 기준")
     rules_version: str
-    status: ProcessingStatus = Field(default=ProcessingStatus.PENDING)
+    status: ProcessingStatusValue = Field(default="pending")
     progress: int = Field(default=0, description="진행률 (0-100)")
     total_cases: int
     processed_cases: int = Field(default=0)
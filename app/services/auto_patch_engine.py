@@ -3,19 +3,55 @@
 AI 제안을 DSL 규칙 패치로 변환하고 적용
 """
 
-import re
+import asyncio
+import bisect
+import functools
+import hashlib
+import itertools
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple, FrozenSet
 from datetime import datetime
 import logging
 from dataclasses import dataclass
 
-from app.services.dsl_rules import DSLRule, dsl_manager
+import orjson
+
+from app.services.dsl_rules import DSLRule, RULE_FLAGS, check_pattern, dsl_manager, pattern_keywords
 from app.services.openai_service import OpenAIService
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+# 기존 규칙과 중복으로 판단하는 패턴 유사도 기준
+DUPLICATE_SIMILARITY_THRESHOLD = 0.8
+
+# 응답 중간의 JSON 객체 하나만 읽고 뒤따르는 텍스트는 무시하는 디코더
+_JSON_DECODER = json.JSONDecoder()
+
+# 고급 제안 응답 캐시에 보관할 최대 프롬프트 수
+ENHANCEMENT_CACHE_SIZE = 1024
+
+# 타입별 중복 검사용 규칙 스냅샷 - (키워드 수 오름차순 (규칙, 키워드 집합, 키워드 수) 목록, 키워드 수 목록)
+_RuleSnapshot = Tuple[List[Tuple[DSLRule, FrozenSet[str], int]], List[int]]
+
+# 제안 생성 시각 캐시 - 한 배치에서 연달아 만드는 제안은 같은 값을 공유
+_last_iso_time = 0.0
+_last_iso = ""
+
+
+def _now_iso() -> str:
+    """현재 시각 ISO 문자열 (1ms 이내 연속 호출은 직전 값 재사용)"""
+    global _last_iso_time, _last_iso
+    now = time.time()
+    if now - _last_iso_time >= 0.001:
+        _last_iso_time = now
+        _last_iso = datetime.fromtimestamp(now).isoformat()
+    return _last_iso
+
+
+@dataclass(slots=True)
 class PatchSuggestion:
     """패치 제안 데이터 구조"""
     suggestion_id: str
@@ -30,15 +66,132 @@ class PatchSuggestion:
     
     def __post_init__(self):
         if self.created_at is None:
-            self.created_at = datetime.now().isoformat()
+            self.created_at = _now_iso()
+
+
+# 제안 dict → PatchSuggestion 필드 매핑 - (필드, 제안 키, 기본값), applicable_cases 기본값 None은 ['general']
+_SuggestionFields = Tuple[Tuple[str, str, Any], ...]
+
+# 평가 응답의 개선 제안 (analyze_suggestions)
+_SUGGESTION_FIELDS: _SuggestionFields = (
+    ('description', 'description', ''),
+    ('confidence_score', 'confidence_score', 0.5),
+    ('rule_type', 'rule_type', 'regex_improvement'),
+    ('estimated_improvement', 'estimated_improvement', ''),
+    ('applicable_cases', 'applicable_cases', None),
+    ('pattern_before', 'pattern_before', ''),
+    ('pattern_after', 'pattern_after', ''),
+)
+
+# 고급 제안 프롬프트 응답 (_build_enhanced_suggestions)
+_ENHANCED_SUGGESTION_FIELDS: _SuggestionFields = (
+    ('description', 'description', ''),
+    ('confidence_score', 'confidence', 0.8),
+    ('rule_type', 'type', 'regex_improvement'),
+    ('estimated_improvement', 'improvement', ''),
+    ('applicable_cases', 'cases', None),
+    ('pattern_before', 'before', ''),
+    ('pattern_after', 'after', ''),
+)
+
+
+def _suggestion_kwargs(suggestion: Dict[str, Any], fields: _SuggestionFields) -> Dict[str, Any]:
+    """제안 dict에서 PatchSuggestion 생성 인자를 한 번에 추출"""
+    kwargs = {field: suggestion.get(key, default) for field, key, default in fields}
+    if kwargs['applicable_cases'] is None:
+        kwargs['applicable_cases'] = ['general']  # 제안마다 새 목록 (인스턴스 간 공유 방지)
+    return kwargs
+
+
+# 고급 제안 프롬프트의 고정 부분 (지표와 문서 일부만 호출마다 채움)
+_ENHANCEMENT_PROMPT_PREAMBLE = """
+다음 법률 문서 전처리 결과를 분석하고 개선 방안을 제시해주세요.
+
+**현재 성능 지표:**
+"""
+
+_ENHANCEMENT_PROMPT_SUFFIX = """...
+
+**개선 방향:**
+1. NRR < 0.8인 경우: 더 많은 노이즈 패턴 식별 필요
+2. ICR < 0.9인 경우: 중요 사실 보존 규칙 강화 필요  
+3. 토큰 절감률 < 20%인 경우: 더 공격적인 압축 필요
+
+다음 JSON 형식으로 구체적인 개선 제안을 해주세요:
+
+{
+  "suggestions": [
+    {
+      "description": "구체적인 개선 내용",
+      "type": "noise_removal|fact_extraction|legal_filtering",
+      "confidence": 0.85,
+      "improvement": "예상 개선 효과",
+      "cases": ["민사", "형사", "행정"],
+      "before": "현재 패턴 (정규식)",
+      "after": "개선된 패턴 (정규식)"
+    }
+  ]
+}
+"""
+
+
+@functools.lru_cache(maxsize=256)
+def _build_enhancement_prompt(original_head: str, processed_head: str,
+                              nrr: float, icr: float, ss: float, token_reduction: float) -> str:
+    """고급 제안 프롬프트 본문 (재시도 등으로 같은 입력이 반복되면 캐시된 문자열 재사용)"""
+    return (
+        _ENHANCEMENT_PROMPT_PREAMBLE
+        + f"- NRR (노이즈 제거율): {nrr:.2f}\n"
+        + f"- ICR (중요 내용 보존율): {icr:.2f}  \n"
+        + f"- SS (의미 유사성): {ss:.2f}\n"
+        + f"- 토큰 절감률: {token_reduction:.1f}%\n"
+        + f"\n**원본 문서 (처음 1000자):**\n{original_head}...\n"
+        + f"\n**전처리 결과 (처음 1000자):**\n{processed_head}"
+        + _ENHANCEMENT_PROMPT_SUFFIX
+    )
+
+
+@dataclass(frozen=True, slots=True)
+class _PatchRuleSpec:
+    """패치 타입별 DSL 규칙 생성 명세"""
+    rule_type: Optional[str]  # None이면 패치의 rule_type을 그대로 사용
+    priority: int
+    id_prefix: Optional[str]  # None이면 'ai_{rule_type}'
+    label: str
+    replace_before: bool = False  # pattern_before를 pattern_after로 치환하는 규칙 생성
+    fallback_before: bool = False  # pattern_after가 비어 있으면 pattern_before 사용
+    update_existing: bool = False  # pattern_before와 같은 기존 규칙이 있으면 갱신
+
+
+# AI가 DSL 규칙 타입으로 직접 제안한 규칙 (높은 우선순위)
+_AI_RULE_SPEC = _PatchRuleSpec(None, 80, None, "AI 제안", replace_before=True)
+
+_PATCH_RULE_SPECS: Dict[str, _PatchRuleSpec] = {
+    'regex_improvement': _PatchRuleSpec("noise_removal", 60, "ai_improved", "AI 제안", update_existing=True),
+    'new_pattern': _PatchRuleSpec("noise_removal", 50, "ai_new", "AI 신규"),
+    'filter_enhancement': _PatchRuleSpec("legal_filtering", 70, "ai_filter", "AI 필터"),
+    'legal_filtering': _AI_RULE_SPEC,
+    'noise_removal': _AI_RULE_SPEC,
+    'redundancy_removal': _AI_RULE_SPEC,
+}
+
+_DEFAULT_PATCH_RULE_SPEC = _PatchRuleSpec("noise_removal", 40, "ai_generic", "AI 일반", fallback_before=True)
 
 
 class AutoPatchEngine:
     """자동 패치 엔진"""
     
+    # 같은 초에 연달아 호출되어도 제안 ID가 겹치지 않도록 프로세스 전역 일련번호 사용
+    _id_counter = itertools.count()
+    
     def __init__(self):
         self.openai_service = None
         self.patch_history: List[Dict[str, Any]] = []
+        self._patch_history_index: Dict[str, Dict[str, Any]] = {}  # patch_id → 히스토리 항목
+        # 프롬프트 해시 → 파싱된 고급 제안 (LRU, 같은 문서를 다시 분석할 때 API 호출 생략)
+        self._enhancement_cache: OrderedDict[str, List[Dict[str, Any]]] = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.performance_threshold = 0.5  # 최소 신뢰도 점수 (AI 제안 모두 신뢰)
         
     def _init_openai_service(self):
@@ -56,67 +209,83 @@ class AutoPatchEngine:
         """AI 제안을 분석하여 패치 제안으로 변환"""
         patch_suggestions = []
         
-        for i, suggestion in enumerate(suggestions):
+        # 호출 동안 규칙 세트는 바뀌지 않으므로 타입별 규칙 스냅샷을 한 번만 구성해 공유
+        rule_snapshot: Dict[str, _RuleSnapshot] = {}
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        
+        for suggestion in suggestions:
             try:
-                # 기본 정보 추출
-                description = suggestion.get('description', '')
+                # 신뢰도 기준 필터링 - 나머지 필드 추출, 중복 검사, 제안 생성 전에 먼저 제외
                 confidence = suggestion.get('confidence_score', 0.5)
-                rule_type = suggestion.get('rule_type', 'regex_improvement')
-                estimated_improvement = suggestion.get('estimated_improvement', '')
-                applicable_cases = suggestion.get('applicable_cases', ['general'])
-                pattern_before = suggestion.get('pattern_before', '')
-                pattern_after = suggestion.get('pattern_after', '')
+                if confidence < self.performance_threshold:
+                    logger.debug("패치 제안 제외: 신뢰도 부족 (%s < %s)", confidence, self.performance_threshold)
+                    continue
+                
+                # 기본 정보 추출
+                fields = _suggestion_kwargs(suggestion, _SUGGESTION_FIELDS)
                 
                 # 중복 규칙 확인 (추가된 부분)
-                if self._is_duplicate_pattern(pattern_before, rule_type):
-                    print(f"🔧 DEBUG: 패치 제안 제외: 중복 패턴 발견 - {description}")
-                    logger.info(f"패치 제안 제외: 중복 패턴 - {description}")
+                if self._is_duplicate_pattern(fields['pattern_before'], fields['rule_type'], rule_snapshot):
+                    logger.info(f"패치 제안 제외: 중복 패턴 - {fields['description']}")
                     continue
                 
                 # 패치 제안 생성
                 patch = PatchSuggestion(
-                    suggestion_id=f"patch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{i}",
-                    description=description,
-                    confidence_score=confidence,
-                    rule_type=rule_type,
-                    estimated_improvement=estimated_improvement,
-                    applicable_cases=applicable_cases,
-                    pattern_before=pattern_before,
-                    pattern_after=pattern_after
+                    suggestion_id=f"patch_{timestamp}_{next(self._id_counter)}",
+                    **fields
                 )
-                
-                # 신뢰도 기준 필터링
-                if confidence >= self.performance_threshold:
-                    patch_suggestions.append(patch)
-                    print(f"🔧 DEBUG: 패치 제안 생성: {patch.suggestion_id} (신뢰도: {confidence})")
-                    logger.info(f"패치 제안 생성: {patch.suggestion_id} (신뢰도: {confidence})")
-                else:
-                    print(f"🔧 DEBUG: 패치 제안 제외: 신뢰도 부족 ({confidence} < {self.performance_threshold})")
-                    logger.debug(f"패치 제안 제외: 신뢰도 부족 ({confidence} < {self.performance_threshold})")
+                patch_suggestions.append(patch)
+                logger.info(f"패치 제안 생성: {patch.suggestion_id} (신뢰도: {confidence})")
                     
             except Exception as e:
                 logger.error(f"패치 제안 분석 오류: {e}")
         
         return patch_suggestions
     
-    def _is_duplicate_pattern(self, pattern: str, rule_type: str) -> bool:
-        """제안된 패턴이 기존 규칙과 중복되는지 확인"""
+    def _rule_snapshot(self, rule_type: str, snapshot: Dict[str, _RuleSnapshot]) -> _RuleSnapshot:
+        """중복 검사용 활성 규칙 스냅샷 - 키워드 수 순으로 정렬, 타입별 최초 1회 구성"""
+        entry = snapshot.get(rule_type)
+        if entry is None:
+            rules = sorted(
+                (
+                    (rule, rule.keyword_set, rule.keyword_count)
+                    for rule in dsl_manager.rules_by_type.get(rule_type, ())
+                    if rule.enabled
+                ),
+                key=lambda item: item[2]
+            )
+            entry = (rules, [count for _, _, count in rules])
+            snapshot[rule_type] = entry
+        return entry
+    
+    def _is_duplicate_pattern(self, pattern: str, rule_type: str,
+                              snapshot: Optional[Dict[str, _RuleSnapshot]] = None) -> bool:
+        """제안된 패턴이 기존 규칙과 중복되는지 확인 (snapshot을 넘기면 여러 호출에서 재사용)"""
         try:
-            from app.services.dsl_rules import dsl_manager
+            # 새 패턴의 키워드는 한 번만 추출 (기존 규칙은 규칙별로 캐시된 집합 사용)
+            keywords = pattern_keywords(pattern)
+            if not keywords:
+                return False
+            keyword_count = len(keywords)
             
-            # 현재 활성화된 규칙들 가져오기
-            existing_rules = dsl_manager.get_sorted_rules()
+            # 동일한 타입의 활성 규칙만 비교
+            if snapshot is None:
+                snapshot = {}
+            existing_rules, existing_counts = self._rule_snapshot(rule_type, snapshot)
             
-            for existing_rule in existing_rules:
-                # 동일한 규칙 타입만 비교
-                if existing_rule.rule_type != rule_type:
-                    continue
-                
-                # 패턴 유사도 확인
-                if self._calculate_pattern_similarity(pattern, existing_rule.pattern) > 0.8:
-                    print(f"🔧 DEBUG: 중복 패턴 발견 - 기존: {existing_rule.rule_id}")
-                    print(f"🔧 DEBUG: 기존 패턴: {existing_rule.pattern[:100]}...")
-                    print(f"🔧 DEBUG: 새 패턴: {pattern[:100]}...")
+            # Jaccard 유사도는 min(|A|,|B|)/max(|A|,|B|)를 넘을 수 없으므로 키워드 수가
+            # (기준 × n, n / 기준) 범위 밖인 규칙은 이진 탐색으로 한 번에 제외
+            start = bisect.bisect_right(existing_counts, DUPLICATE_SIMILARITY_THRESHOLD * keyword_count)
+            end = bisect.bisect_left(existing_counts, keyword_count / DUPLICATE_SIMILARITY_THRESHOLD)
+            
+            for existing_rule, existing_keywords, existing_count in existing_rules[start:end]:
+                # 패턴 유사도 확인 (키워드 수는 양쪽 모두 이미 알고 있으므로 그대로 전달)
+                similarity = self._calculate_pattern_similarity(
+                    keywords, existing_keywords, keyword_count, existing_count
+                )
+                if similarity > DUPLICATE_SIMILARITY_THRESHOLD:
+                    logger.debug("중복 패턴 발견 - 기존: %s, 기존 패턴: %.100s, 새 패턴: %.100s",
+                                 existing_rule.rule_id, existing_rule.pattern, pattern)
                     return True
             
             return False
@@ -125,43 +294,39 @@ class AutoPatchEngine:
             logger.warning(f"중복 패턴 확인 실패: {e}")
             return False
     
-    def _calculate_pattern_similarity(self, pattern1: str, pattern2: str) -> float:
-        """두 정규식 패턴의 유사도를 계산 (0.0 ~ 1.0)"""
-        try:
-            # 정규식 특수문자 제거하고 핵심 키워드 추출
-            import re
-            
-            # 기본적인 정규식 메타문자 제거
-            clean_pattern1 = re.sub(r'[(){}[\]\\^$.*+?|]', ' ', pattern1.lower())
-            clean_pattern2 = re.sub(r'[(){}[\]\\^$.*+?|]', ' ', pattern2.lower())
-            
-            # 공백으로 분할하여 키워드 추출
-            keywords1 = set(word for word in clean_pattern1.split() if len(word) > 1)
-            keywords2 = set(word for word in clean_pattern2.split() if len(word) > 1)
-            
-            if not keywords1 or not keywords2:
-                return 0.0
-            
-            # Jaccard 유사도 계산
-            intersection = len(keywords1.intersection(keywords2))
-            union = len(keywords1.union(keywords2))
-            
-            similarity = intersection / union if union > 0 else 0.0
-            
-            print(f"🔧 DEBUG: 패턴 유사도 계산 - {similarity:.2f}")
-            print(f"🔧 DEBUG: 키워드1: {keywords1}")
-            print(f"🔧 DEBUG: 키워드2: {keywords2}")
-            
-            return similarity
-            
-        except Exception as e:
-            logger.warning(f"패턴 유사도 계산 실패: {e}")
+    def _calculate_pattern_similarity(self, keywords1: FrozenSet[str], keywords2: FrozenSet[str],
+                                      count1: int, count2: int) -> float:
+        """두 패턴 키워드 집합의 유사도를 계산 (0.0 ~ 1.0, count는 각 집합의 크기)"""
+        if not count1 or not count2:
             return 0.0
+        
+        # Jaccard 유사도 계산 - 합집합은 만들지 않고 |A| + |B| - |A∩B|로 계산
+        if count1 > count2:
+            keywords1, keywords2 = keywords2, keywords1
+        intersection = len(keywords1 & keywords2)
+        union = count1 + count2 - intersection
+        
+        return intersection / union if union else 0.0
     
     def generate_enhanced_suggestions(self, original_content: str, 
                                     processed_content: str,
                                     quality_metrics: Dict[str, float]) -> List[PatchSuggestion]:
-        """AI를 사용하여 고급 패치 제안 생성"""
+        """AI를 사용하여 고급 패치 제안 생성 (동기 래퍼 - 이벤트 루프 밖에서만 사용)"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # API 오류는 비동기 버전이 처리하고 빈 목록을 반환
+            return asyncio.run(self.generate_enhanced_suggestions_async(
+                original_content, processed_content, quality_metrics
+            ))
+        raise RuntimeError(
+            "이벤트 루프 안에서는 generate_enhanced_suggestions_async를 await해야 합니다"
+        )
+    
+    async def generate_enhanced_suggestions_async(self, original_content: str,
+                                                  processed_content: str,
+                                                  quality_metrics: Dict[str, float]) -> List[PatchSuggestion]:
+        """AI를 사용하여 고급 패치 제안 생성 (문서 1건 - 즉시 응답이 필요할 때 사용)"""
         try:
             self._init_openai_service()
             
@@ -170,27 +335,15 @@ class AutoPatchEngine:
                 original_content, processed_content, quality_metrics
             )
             
-            # OpenAI API 호출
-            response = self.openai_service._make_api_call(enhancement_prompt)
-            
-            # 응답 파싱
-            suggestions_data = self._parse_enhancement_response(response)
-            
-            # 패치 제안으로 변환
-            patch_suggestions = []
-            for suggestion in suggestions_data:
-                patch = PatchSuggestion(
-                    suggestion_id=f"enhanced_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{len(patch_suggestions)}",
-                    description=suggestion.get('description', ''),
-                    confidence_score=suggestion.get('confidence', 0.8),
-                    rule_type=suggestion.get('type', 'regex_improvement'),
-                    estimated_improvement=suggestion.get('improvement', ''),
-                    applicable_cases=suggestion.get('cases', ['general']),
-                    pattern_before=suggestion.get('before', ''),
-                    pattern_after=suggestion.get('after', '')
-                )
-                patch_suggestions.append(patch)
+            # 같은 프롬프트의 응답이 캐시에 있으면 API 호출 생략
+            cache_key = self._enhancement_cache_key(enhancement_prompt)
+            suggestions_data = self._get_cached_enhancement(cache_key)
+            if suggestions_data is None:
+                response = await self.openai_service._make_api_call(enhancement_prompt)
+                suggestions_data = self._parse_enhancement_response(response)
+                self._store_enhancement(cache_key, suggestions_data)
             
+            patch_suggestions = self._build_enhanced_suggestions(suggestions_data)
             logger.info(f"고급 패치 제안 생성 완료: {len(patch_suggestions)}개")
             return patch_suggestions
             
@@ -198,62 +351,112 @@ class AutoPatchEngine:
             logger.error(f"고급 패치 제안 생성 실패: {e}")
             return []
     
+    async def generate_enhanced_suggestions_batch(
+        self, items: List[Tuple[str, str, Dict[str, float]]]
+    ) -> List[List[PatchSuggestion]]:
+        """여러 문서의 고급 패치 제안을 Batch API 작업 하나로 생성 - (원본, 전처리 결과, 품질 지표) 목록
+        
+        문서마다 API를 호출하지 않고 한 번에 제출해 완료를 한 번만 기다림 (결과는 입력 순서대로 반환).
+        """
+        if not items:
+            return []
+        
+        try:
+            self._init_openai_service()
+            
+            # 캐시에 없는 프롬프트만 배치로 제출
+            cache_keys = []
+            cached: Dict[str, List[Dict[str, Any]]] = {}
+            prompts: Dict[str, str] = {}
+            for index, (original, processed, metrics) in enumerate(items):
+                prompt = self._create_enhancement_prompt(original, processed, metrics)
+                cache_key = self._enhancement_cache_key(prompt)
+                cache_keys.append(cache_key)
+                suggestions_data = self._get_cached_enhancement(cache_key)
+                if suggestions_data is not None:
+                    cached[cache_key] = suggestions_data
+                elif cache_key not in cached:
+                    prompts.setdefault(cache_key, prompt)
+            
+            responses = await self.openai_service.submit_batch(prompts) if prompts else {}
+            for cache_key, response in responses.items():
+                cached[cache_key] = self._parse_enhancement_response(response)
+                self._store_enhancement(cache_key, cached[cache_key])
+            
+            results = [self._build_enhanced_suggestions(cached.get(cache_key, [])) for cache_key in cache_keys]
+            
+            logger.info(f"고급 패치 제안 배치 생성 완료: 문서 {len(items)}개, "
+                        f"제안 {sum(len(suggestions) for suggestions in results)}개")
+            return results
+            
+        except Exception as e:
+            logger.error(f"고급 패치 제안 배치 생성 실패: {e}")
+            return [[] for _ in items]
+    
+    def _enhancement_cache_key(self, prompt: str) -> str:
+        """고급 제안 캐시 키 (프롬프트 해시)"""
+        return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest()
+    
+    def _get_cached_enhancement(self, cache_key: str) -> Optional[List[Dict[str, Any]]]:
+        """캐시된 고급 제안 조회 (없으면 None)"""
+        suggestions_data = self._enhancement_cache.get(cache_key)
+        if suggestions_data is None:
+            self.cache_misses += 1
+            return None
+        self._enhancement_cache.move_to_end(cache_key)
+        self.cache_hits += 1
+        return suggestions_data
+    
+    def _store_enhancement(self, cache_key: str, suggestions_data: List[Dict[str, Any]]):
+        """고급 제안 캐시 저장 (파싱 실패 등으로 비어 있으면 다음에 다시 요청하도록 저장하지 않음)"""
+        if not suggestions_data:
+            return
+        self._enhancement_cache[cache_key] = suggestions_data
+        self._enhancement_cache.move_to_end(cache_key)
+        if len(self._enhancement_cache) > ENHANCEMENT_CACHE_SIZE:
+            self._enhancement_cache.popitem(last=False)
+    
+    def _build_enhanced_suggestions(self, suggestions_data: List[Dict[str, Any]]) -> List[PatchSuggestion]:
+        """파싱된 고급 제안을 패치 제안 목록으로 변환 (호출마다 새 ID 부여)"""
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return [
+            PatchSuggestion(
+                suggestion_id=f"enhanced_{timestamp}_{next(self._id_counter)}",
+                **_suggestion_kwargs(suggestion, _ENHANCED_SUGGESTION_FIELDS)
+            )
+            for suggestion in suggestions_data
+        ]
+    
     def _create_enhancement_prompt(self, original: str, processed: str, 
                                  metrics: Dict[str, float]) -> str:
         """고급 제안 생성을 위한 프롬프트 생성"""
-        return f"""
-다음 법률 문서 전처리 결과를 분석하고 개선 방안을 제시해주세요.
-
-**현재 성능 지표:**
-- NRR (노이즈 제거율): {metrics.get('nrr', 0):.2f}
-- ICR (중요 내용 보존율): {metrics.get('icr', 0):.2f}  
-- SS (의미 유사성): {metrics.get('ss', 0):.2f}
-- 토큰 절감률: {metrics.get('token_reduction', 0):.1f}%
-
-**원본 문서 (처음 1000자):**
-{original[:1000]}...
-
-**전처리 결과 (처음 1000자):**
-{processed[:1000]}...
-
-**개선 방향:**
-1. NRR < 0.8인 경우: 더 많은 노이즈 패턴 식별 필요
-2. ICR < 0.9인 경우: 중요 사실 보존 규칙 강화 필요  
-3. 토큰 절감률 < 20%인 경우: 더 공격적인 압축 필요
-
-다음 JSON 형식으로 구체적인 개선 제안을 해주세요:
-
-{{
-  "suggestions": [
-    {{
-      "description": "구체적인 개선 내용",
-      "type": "noise_removal|fact_extraction|legal_filtering",
-      "confidence": 0.85,
-      "improvement": "예상 개선 효과",
-      "cases": ["민사", "형사", "행정"],
-      "before": "현재 패턴 (정규식)",
-      "after": "개선된 패턴 (정규식)"
-    }}
-  ]
-}}
-"""
+        return _build_enhancement_prompt(
+            original[:1000], processed[:1000],
+            metrics.get('nrr', 0), metrics.get('icr', 0),
+            metrics.get('ss', 0), metrics.get('token_reduction', 0)
+        )
     
     def _parse_enhancement_response(self, response: str) -> List[Dict[str, Any]]:
         """고급 제안 응답 파싱"""
         try:
-            # JSON 추출
-            json_text = response
-            if "```json" in response:
-                start = response.find("```json") + 7
-                end = response.find("```", start)
-                if end != -1:
-                    json_text = response[start:end].strip()
-            elif "{" in response and "}" in response:
+            # JSON 추출 (```json 블록 우선, 없으면 첫 '{'부터 마지막 '}'까지) - 정규식 없이 한 번씩만 탐색
+            _, fence, rest = response.partition("```json")
+            json_text, closing, _ = rest.partition("```")
+            if fence and closing:
+                data = orjson.loads(json_text)
+            else:
                 start = response.find("{")
-                end = response.rfind("}") + 1
-                json_text = response[start:end].strip()
+                end = response.rfind("}")
+                if start == -1 or end < start:
+                    data = orjson.loads(response)
+                else:
+                    try:
+                        data = orjson.loads(response[start:end + 1])
+                    except orjson.JSONDecodeError:
+                        # JSON 뒤의 설명문에 '}'가 있으면 마지막 '}'까지 자른 범위가 깨지므로
+                        # 첫 '{'부터 객체 하나만 디코딩 (문자열 안의 중괄호는 디코더가 처리)
+                        data, _ = _JSON_DECODER.raw_decode(response, start)
             
-            data = json.loads(json_text)
             return data.get('suggestions', [])
             
         except Exception as e:
@@ -263,31 +466,25 @@ class AutoPatchEngine:
     def apply_patch(self, patch: PatchSuggestion) -> Tuple[bool, str]:
         """패치를 DSL 규칙으로 적용"""
         try:
-            print(f"🔧 DEBUG: 패치 적용 시도 - ID: {patch.suggestion_id}, Type: {patch.rule_type}")
-            print(f"🔧 DEBUG: Pattern Before: {patch.pattern_before}")
-            print(f"🔧 DEBUG: Pattern After: {patch.pattern_after}")
+            logger.debug("패치 적용 시도 - ID: %s, Type: %s, Before: %s, After: %s",
+                         patch.suggestion_id, patch.rule_type, patch.pattern_before, patch.pattern_after)
             
             # 패치 타입에 따른 규칙 생성
-            if patch.rule_type == 'regex_improvement':
-                success = self._apply_regex_improvement(patch)
-            elif patch.rule_type == 'new_pattern':
-                success = self._apply_new_pattern(patch)
-            elif patch.rule_type == 'filter_enhancement':
-                success = self._apply_filter_enhancement(patch)
-            elif patch.rule_type in ['legal_filtering', 'noise_removal', 'redundancy_removal']:
-                success = self._apply_ai_rule(patch)
-            else:
-                success = self._apply_generic_patch(patch)
+            spec = _PATCH_RULE_SPECS.get(patch.rule_type, _DEFAULT_PATCH_RULE_SPEC)
+            success, rule_ids = self._apply_from_spec(patch, spec)
             
             if success:
                 # 패치 히스토리 기록
-                self.patch_history.append({
+                history_entry = {
                     'patch_id': patch.suggestion_id,
                     'description': patch.description,
                     'applied_at': datetime.now().isoformat(),
                     'confidence': patch.confidence_score,
-                    'rule_type': patch.rule_type
-                })
+                    'rule_type': patch.rule_type,
+                    'rule_ids': rule_ids  # 이 패치가 새로 추가한 규칙 (롤백 시 비활성화)
+                }
+                self.patch_history.append(history_entry)
+                self._patch_history_index.setdefault(patch.suggestion_id, history_entry)
                 
                 message = f"패치 적용 성공: {patch.suggestion_id}"
                 logger.info(message)
@@ -302,119 +499,58 @@ class AutoPatchEngine:
             logger.error(message)
             return False, message
     
-    def _apply_regex_improvement(self, patch: PatchSuggestion) -> bool:
-        """정규식 개선 패치 적용"""
+    def _apply_from_spec(self, patch: PatchSuggestion, spec: _PatchRuleSpec) -> Tuple[bool, List[str]]:
+        """패치 타입별 규칙 명세에 따라 DSL 규칙을 생성(또는 기존 규칙을 갱신)해 적용
+        
+        (성공 여부, 새로 추가된 규칙 ID 목록)을 반환 - 기존 규칙 갱신이나 중복 규칙은 목록에 넣지 않음
+        """
         try:
-            # 기존 규칙 찾기 (패턴 기반)
-            existing_rule = None
-            for rule in dsl_manager.rules.values():
-                if rule.pattern == patch.pattern_before:
-                    existing_rule = rule
-                    break
+            if spec.update_existing:
+                # 기존 규칙 찾기 (패턴 기반) - 있으면 새 패턴으로 업데이트
+                rule_id = dsl_manager.rules_by_pattern.get(patch.pattern_before)
+                existing_rule = dsl_manager.rules.get(rule_id) if rule_id else None
+                if existing_rule:
+                    # 새 패턴은 미리 검사하고 컴파일해 검증
+                    check_pattern(patch.pattern_after)
+                    re.compile(patch.pattern_after, RULE_FLAGS)
+                    updated = dsl_manager.update_rule(
+                        existing_rule.rule_id,
+                        pattern=patch.pattern_after,
+                        description=f"{existing_rule.description} (AI 개선)",
+                        performance_score=patch.confidence_score
+                    )
+                    return updated, []
             
-            if existing_rule:
-                # 기존 규칙 업데이트
-                return dsl_manager.update_rule(
-                    existing_rule.rule_id,
-                    pattern=patch.pattern_after,
-                    description=f"{existing_rule.description} (AI 개선)",
-                    performance_score=patch.confidence_score
-                )
+            if spec.replace_before:
+                # AI가 제거하려는 패턴을 대체 내용(보통 빈 문자열)으로 치환
+                pattern, replacement = patch.pattern_before, patch.pattern_after
+            elif spec.fallback_before:
+                pattern, replacement = patch.pattern_after or patch.pattern_before, ""
             else:
-                # 새 규칙 생성
-                new_rule = DSLRule(
-                    rule_id=f"ai_improved_{patch.suggestion_id}",
-                    rule_type="noise_removal",
-                    pattern=patch.pattern_after,
-                    replacement="",
-                    priority=60,
-                    description=f"AI 제안: {patch.description}",
-                    performance_score=patch.confidence_score
-                )
-                return dsl_manager.add_rule(new_rule)
-                
-        except Exception as e:
-            logger.error(f"정규식 개선 패치 적용 오류: {e}")
-            return False
-    
-    def _apply_new_pattern(self, patch: PatchSuggestion) -> bool:
-        """새 패턴 패치 적용"""
-        try:
-            new_rule = DSLRule(
-                rule_id=f"ai_new_{patch.suggestion_id}",
-                rule_type="noise_removal",
-                pattern=patch.pattern_after,
-                replacement="",
-                priority=50,
-                description=f"AI 신규: {patch.description}",
-                performance_score=patch.confidence_score
-            )
-            return dsl_manager.add_rule(new_rule)
-            
-        except Exception as e:
-            logger.error(f"새 패턴 패치 적용 오류: {e}")
-            return False
-    
-    def _apply_filter_enhancement(self, patch: PatchSuggestion) -> bool:
-        """필터 강화 패치 적용"""
-        try:
-            new_rule = DSLRule(
-                rule_id=f"ai_filter_{patch.suggestion_id}",
-                rule_type="legal_filtering",
-                pattern=patch.pattern_after,
-                replacement="",
-                priority=70,
-                description=f"AI 필터: {patch.description}",
-                performance_score=patch.confidence_score
-            )
-            return dsl_manager.add_rule(new_rule)
-            
-        except Exception as e:
-            logger.error(f"필터 강화 패치 적용 오류: {e}")
-            return False
-    
-    def _apply_generic_patch(self, patch: PatchSuggestion) -> bool:
-        """일반 패치 적용"""
-        try:
-            new_rule = DSLRule(
-                rule_id=f"ai_generic_{patch.suggestion_id}",
-                rule_type="noise_removal",
-                pattern=patch.pattern_after if patch.pattern_after else patch.pattern_before,
-                replacement="",
-                priority=40,
-                description=f"AI 일반: {patch.description}",
-                performance_score=patch.confidence_score
-            )
-            return dsl_manager.add_rule(new_rule)
+                pattern, replacement = patch.pattern_after, ""
             
-        except Exception as e:
-            logger.error(f"일반 패치 적용 오류: {e}")
-            return False
-    
-    def _apply_ai_rule(self, patch: PatchSuggestion) -> bool:
-        """AI 제안 규칙 적용"""
-        try:
-            print(f"🔧 DEBUG: AI 규칙 적용 - {patch.description}")
-            
-            # AI 제안에 맞는 DSL 규칙 생성
+            rule_type = spec.rule_type or patch.rule_type
             new_rule = DSLRule(
-                rule_id=f"ai_{patch.rule_type}_{patch.suggestion_id}",
-                rule_type=patch.rule_type,
-                pattern=patch.pattern_before,  # AI가 제거하려는 패턴
-                replacement=patch.pattern_after,  # 대체할 내용 (보통 빈 문자열)
-                priority=80,  # 높은 우선순위
-                description=f"AI 제안: {patch.description}",
+                rule_id=f"{spec.id_prefix or f'ai_{rule_type}'}_{patch.suggestion_id}",
+                rule_type=rule_type,
+                pattern=pattern,
+                replacement=replacement,
+                priority=spec.priority,
+                description=f"{spec.label}: {patch.description}",
                 performance_score=patch.confidence_score
             )
-            
+            new_rule.validate()
             result = dsl_manager.add_rule(new_rule)
-            print(f"🔧 DEBUG: DSL 규칙 추가 결과: {result}")
-            return result
+            logger.debug("DSL 규칙 추가 결과: %s", result)
+            # 중복 규칙이면 add_rule이 추가 없이 성공을 반환하므로 실제로 들어간 경우만 기록
+            return result, [new_rule.rule_id] if result and new_rule.rule_id in dsl_manager.rules else []
             
+        except re.error as e:
+            logger.error(f"패치 패턴 검증 실패 {patch.suggestion_id}: {e}")
+            return False, []
         except Exception as e:
-            print(f"🔧 ERROR: AI 규칙 적용 오류: {e}")
-            logger.error(f"AI 규칙 적용 오류: {e}")
-            return False
+            logger.error(f"{spec.label} 패치 적용 오류: {e}")
+            return False, []
     
     def auto_apply_patches(self, patches: List[PatchSuggestion], 
                           auto_apply_threshold: float = 0.5) -> Dict[str, Any]:
@@ -429,33 +565,41 @@ class AutoPatchEngine:
             'failed_patches': []
         }
         
+        # 신뢰도 기준으로 한 번에 분류 - 자동 적용 대상은 신뢰도 높은 순으로 먼저 적용
+        auto_patches, manual_patches = [], []
         for patch in patches:
-            if patch.confidence_score >= auto_apply_threshold:
-                # 자동 적용
-                success, message = self.apply_patch(patch)
-                if success:
-                    results['auto_applied'] += 1
-                    results['applied_patches'].append({
-                        'patch_id': patch.suggestion_id,
-                        'description': patch.description,
-                        'confidence': patch.confidence_score
-                    })
-                else:
-                    results['failed'] += 1
-                    results['failed_patches'].append({
-                        'patch_id': patch.suggestion_id,
-                        'error': message
-                    })
-            else:
-                # 수동 검토 필요
-                results['manual_review'] += 1
-                results['review_required'].append({
+            (auto_patches if patch.confidence_score >= auto_apply_threshold else manual_patches).append(patch)
+        auto_patches.sort(key=lambda patch: patch.confidence_score, reverse=True)
+        
+        # 자동 적용
+        for patch in auto_patches:
+            success, message = self.apply_patch(patch)
+            if success:
+                results['auto_applied'] += 1
+                results['applied_patches'].append({
                     'patch_id': patch.suggestion_id,
                     'description': patch.description,
-                    'confidence': patch.confidence_score,
-                    'reason': f'신뢰도 부족 ({patch.confidence_score} < {auto_apply_threshold})'
+                    'confidence': patch.confidence_score
+                })
+            else:
+                results['failed'] += 1
+                results['failed_patches'].append({
+                    'patch_id': patch.suggestion_id,
+                    'error': message
                 })
         
+        # 수동 검토 필요
+        results['manual_review'] = len(manual_patches)
+        results['review_required'] = [
+            {
+                'patch_id': patch.suggestion_id,
+                'description': patch.description,
+                'confidence': patch.confidence_score,
+                'reason': f'신뢰도 부족 ({patch.confidence_score} < {auto_apply_threshold})'
+            }
+            for patch in manual_patches
+        ]
+        
         logger.info(f"자동 패치 적용 완료: 적용 {results['auto_applied']}개, "
                    f"검토 {results['manual_review']}개, 실패 {results['failed']}개")
         
@@ -465,36 +609,32 @@ class AutoPatchEngine:
         """패치 롤백"""
         try:
             # 패치 히스토리에서 찾기
-            patch_record = None
-            for record in self.patch_history:
-                if record['patch_id'] == patch_id:
-                    patch_record = record
-                    break
+            patch_record = self._patch_history_index.get(patch_id)
             
             if not patch_record:
                 return False, f"패치 기록을 찾을 수 없습니다: {patch_id}"
             
-            # 관련 규칙 찾기 및 비활성화
-            rule_id = f"ai_{patch_record['rule_type']}_{patch_id}"
-            if rule_id in dsl_manager.rules:
-                success = dsl_manager.disable_rule(rule_id)
-                if success:
-                    message = f"패치 롤백 성공: {patch_id}"
-                    logger.info(message)
-                    return True, message
-                else:
+            # 적용 시 기록한 규칙 비활성화
+            rule_ids = patch_record.get('rule_ids')
+            if not rule_ids:
+                return False, f"관련 규칙을 찾을 수 없습니다: {patch_id}"
+            
+            for rule_id in rule_ids:
+                if not dsl_manager.disable_rule(rule_id):
                     return False, f"규칙 비활성화 실패: {rule_id}"
-            else:
-                return False, f"관련 규칙을 찾을 수 없습니다: {rule_id}"
+            
+            message = f"패치 롤백 성공: {patch_id}"
+            logger.info(message)
+            return True, message
                 
         except Exception as e:
             message = f"패치 롤백 오류: {str(e)}"
             logger.error(message)
             return False, message
     
-    def get_patch_history(self) -> List[Dict[str, Any]]:
-        """패치 히스토리 조회"""
-        return self.patch_history.copy()
+    def get_patch_history(self) -> Sequence[Dict[str, Any]]:
+        """패치 히스토리 조회 (복사하지 않은 읽기 전용 시퀀스 - 수정하지 말 것)"""
+        return self.patch_history
     
     def get_performance_impact(self, patch_id: str) -> Dict[str, Any]:
         """패치 성능 영향 분석"""
@@ -2,14 +2,19 @@
 배치 처리 서비스
 """
 import asyncio
+import heapq
 import uuid
 from datetime import datetime
+from operator import attrgetter
 from typing import Dict, List, Any, Optional, Tuple
 import logging
+import httpx
+import openai
+import orjson
 from app.core.database import db_manager
 from app.services.openai_service import OpenAIService
 from app.services.dsl_rules import dsl_manager
-from app.services.auto_patch_engine import auto_patch_engine
+from app.services.auto_patch_engine import auto_patch_engine, PatchSuggestion
 
 logger = logging.getLogger(__name__)
 
@@ -47,11 +52,25 @@ class BatchJob:
         }
 
 
+# 개별 평가 동시 호출용 연결 풀 크기 - keep-alive 한도를 전체 한도와 같게 두어
+# 동시 호출이 몰려도 유휴 연결을 닫았다가 다시 맺지 않음
+OPENAI_CONNECTION_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=200, keepalive_expiry=30)
+
+
+# 샘플 케이스 변환에 쓰는 원본 문서 필드 (본문 필드는 컬렉션마다 달라 따로 추가, _id는 항상 포함)
+SAMPLE_CASE_FIELDS = (
+    "court_type", "court", "case_type", "type", "year", "date",
+    "precedent_id", "case_name", "case_number", "court_name", "decision_date"
+)
+
+
 class BatchProcessor:
     """배치 처리기"""
     
     def __init__(self):
-        self.openai_service = OpenAIService()
+        self.openai_service = OpenAIService(
+            http_client=openai.DefaultAsyncHttpxClient(limits=OPENAI_CONNECTION_LIMITS)
+        )
         self.active_jobs: Dict[str, BatchJob] = {}
         self.job_history: List[BatchJob] = []
         
@@ -221,12 +240,10 @@ class BatchProcessor:
                     print(f"✅ DEBUG: 케이스 {case_id} 전처리 사용 - 처리 후 길이: {len(processed_content)}자")
                     print(f"📊 DEBUG: 적용된 규칙 수: {len(applied_rules)}, 규칙: {applied_rules}")
                     
-                    # 토큰 수 계산 - OpenAI 서비스 사용
+                    # 토큰 수 계산 - OpenAI 서비스 사용 (케이스마다 클라이언트를 새로 만들지 않고 공유 인스턴스 사용)
                     try:
-                        from app.services.openai_service import OpenAIService
-                        openai_service = OpenAIService()
-                        token_count_before = openai_service.calculate_token_count(original_content)
-                        token_count_after = openai_service.calculate_token_count(processed_content)
+                        token_count_before = self.openai_service.calculate_token_count(original_content)
+                        token_count_after = self.openai_service.calculate_token_count(processed_content)
                         token_reduction = ((token_count_before - token_count_after) / token_count_before * 100) if token_count_before > 0 else 0
                     except Exception as token_error:
                         # 폴백: 단어 수로 계산
@@ -394,14 +411,16 @@ class BatchProcessor:
             if not content_field:
                 raise Exception("텍스트 내용을 담은 필드를 찾을 수 없습니다")
             
-            # 층화 샘플링 (동적 필드 사용)
+            # 층화 샘플링 (동적 필드 사용) - 샘플링 뒤 케이스 변환에 쓰는 필드만 받아옴
             pipeline = [
                 {"$match": {content_field: {"$exists": True, "$ne": "", "$type": "string"}}},
-                {"$sample": {"size": sample_size}}
+                {"$sample": {"size": sample_size}},
+                {"$project": {field: 1 for field in (content_field, *SAMPLE_CASE_FIELDS)}}
             ]
             
             print(f"🔍 DEBUG: 집계 파이프라인 실행 중... (필드: {content_field})")
-            cursor = collection.aggregate(pipeline)
+            # 샘플 전체를 첫 배치로 받아 getMore 왕복 없이 한 번에 가져옴
+            cursor = collection.aggregate(pipeline, batchSize=sample_size)
             cases = await cursor.to_list(length=sample_size)
             
             print(f"✅ DEBUG: MongoDB에서 {len(cases)}개 케이스 조회 완료")
@@ -437,19 +456,19 @@ class BatchProcessor:
                     }
                 }
                 
-                print(f"🔍 DEBUG: 케이스 {case_data['case_id']} 전처리 시작 ({len(original_content)}자)")
-                
-                # DSL 규칙 적용하여 전처리
-                processed_content, rule_results = dsl_manager.apply_rules(
-                    case_data["before_content"], 
-                    rule_types=None
-                )
-                case_data["after_content"] = processed_content
-                
-                print(f"✅ DEBUG: 케이스 {case_data['case_id']} 전처리 완료 ({len(processed_content)}자)")
-                
                 sample_cases.append(case_data)
             
+            # DSL 규칙 적용하여 전처리 - 정규식 처리가 이벤트 루프를 막지 않도록 워커 스레드 하나에서 순서대로 실행
+            # (GIL 때문에 스레드를 늘려도 빨라지지 않고 공유 규칙 상태 경합만 늘어남)
+            def preprocess_cases() -> List[Tuple[str, Dict[str, Any]]]:
+                return [dsl_manager.apply_rules(case_data["before_content"], None) for case_data in sample_cases]
+            
+            print(f"🔍 DEBUG: {len(sample_cases)}개 케이스 전처리 시작")
+            processed = await asyncio.to_thread(preprocess_cases)
+            for case_data, (processed_content, rule_results) in zip(sample_cases, processed):
+                case_data["after_content"] = processed_content
+                print(f"✅ DEBUG: 케이스 {case_data['case_id']} 전처리 완료 ({len(case_data['before_content'])} → {len(processed_content)}자)")
+            
             print(f"✅ DEBUG: 샘플 선정 완료 - {len(sample_cases)}개 케이스")
             
             # 케이스가 없는 경우 오류 발생
@@ -466,28 +485,31 @@ class BatchProcessor:
             raise
     
     async def _process_sequential(self, cases: List[Dict[str, Any]], job: BatchJob) -> List[Any]:
-        """순차 처리 (Batch API 대신)"""
-        results = []
+        """개별 API 호출로 처리 (Batch API 대신) - 최대 max_concurrent개 케이스를 동시에 평가, 결과는 입력 순서대로"""
+        semaphore = asyncio.Semaphore(job.settings.get('max_concurrent', 10))
         
-        for i, case in enumerate(cases):
-            try:
-                print(f"🔄 DEBUG: 순차 처리 {i+1}/{len(cases)} - {case['case_id']}")
-                
-                # 단일 케이스 평가
-                metrics, errors, suggestions_json = await self.openai_service.evaluate_single_case(
-                    case["before_content"],
-                    case["after_content"], 
-                    case["metadata"]
-                )
-                
-                results.append((case["case_id"], metrics, errors, suggestions_json))
-                job.processed_cases = i + 1
-                
-            except Exception as e:
-                print(f"❌ DEBUG: 순차 처리 실패 - {case['case_id']}: {e}")
-                job.errors.append(f"케이스 {case['case_id']} 처리 실패: {str(e)}")
+        async def evaluate_case(i: int, case: Dict[str, Any]) -> Optional[Tuple[str, Any, List[str], str]]:
+            async with semaphore:
+                try:
+                    print(f"🔄 DEBUG: 개별 처리 {i+1}/{len(cases)} - {case['case_id']}")
+                    
+                    # 단일 케이스 평가
+                    metrics, errors, suggestions_json = await self.openai_service.evaluate_single_case(
+                        case["before_content"],
+                        case["after_content"], 
+                        case["metadata"]
+                    )
+                    
+                    job.processed_cases += 1
+                    return case["case_id"], metrics, errors, suggestions_json
+                    
+                except Exception as e:
+                    print(f"❌ DEBUG: 개별 처리 실패 - {case['case_id']}: {e}")
+                    job.errors.append(f"케이스 {case['case_id']} 처리 실패: {str(e)}")
+                    return None
         
-        return results
+        results = await asyncio.gather(*(evaluate_case(i, case) for i, case in enumerate(cases)))
+        return [result for result in results if result is not None]
     
     async def _analyze_and_apply_patches(self, job: BatchJob, results: List[Any]):
         """결과 분석 및 패치 적용"""
@@ -502,14 +524,12 @@ class BatchProcessor:
                 
                 if suggestions_json:
                     try:
-                        import json
-                        
                         # suggestions_json의 타입 확인
                         print(f"🔍 DEBUG: 케이스 {case_id} 제안 데이터 타입: {type(suggestions_json)}")
                         
                         # 이미 파싱된 객체인지 확인
                         if isinstance(suggestions_json, str):
-                            suggestions_data = json.loads(suggestions_json)
+                            suggestions_data = orjson.loads(suggestions_json)
                         elif isinstance(suggestions_json, (dict, list)):
                             suggestions_data = suggestions_json
                         else:
@@ -533,7 +553,6 @@ class BatchProcessor:
                                 continue
                                 
                             # PatchSuggestion 객체로 변환
-                            from app.services.auto_patch_engine import PatchSuggestion
                             patch = PatchSuggestion(
                                 suggestion_id=f"{case_id}_{len(all_suggestions)}",
                                 rule_type=suggestion.get("rule_type", "noise_removal"),
@@ -622,14 +641,17 @@ class BatchProcessor:
     
     def get_job_history(self, limit: int = 10) -> List[Dict[str, Any]]:
         """작업 히스토리 조회"""
-        # 최신 순으로 정렬
-        sorted_history = sorted(self.job_history, key=lambda x: x.created_at, reverse=True)
-        return [job.to_dict() for job in sorted_history[:limit]]
+        # 최신 순으로 limit개만 선택 (전체 히스토리를 정렬하지 않음)
+        recent_jobs = heapq.nlargest(limit, self.job_history, key=attrgetter("created_at"))
+        return [job.to_dict() for job in recent_jobs]
+    
+    async def aclose(self):
+        """OpenAI 클라이언트 연결 풀 종료 (애플리케이션 종료 시 호출)"""
+        await self.openai_service.aclose()
     
     def _get_current_rules_version(self) -> str:
         """현재 DSL 규칙 버전 가져오기"""
         try:
-            from app.services.dsl_rules import dsl_manager
             return dsl_manager.version
         except Exception as e:
             logger.warning(f"규칙 버전 로드 실패: {e}")
@@ -4,13 +4,101 @@ DSL 규칙 파일 관리 시스템
 """
 
 import re
+import sys
 import json
-from typing import Dict, List, Any, Optional, Tuple
+import threading
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple, FrozenSet
 from datetime import datetime
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 규칙 적용 시 사용하는 정규식 플래그
+RULE_FLAGS = re.DOTALL | re.IGNORECASE | re.MULTILINE
+
+# 규칙 사용 통계 갱신 락 (apply_rules는 이벤트 루프와 워커 스레드에서 동시에 호출될 수 있음)
+_usage_lock = threading.Lock()
+
+# 패턴 키워드 추출 시 제거할 정규식 메타문자
+_META_RE = re.compile(r'[(){}\[\]\\^$.*+?|]')
+
+
+def pattern_keywords(pattern: str) -> FrozenSet[str]:
+    """정규식 패턴에서 메타문자를 제거한 핵심 키워드 집합 (2글자 이상)"""
+    clean_pattern = _META_RE.sub(' ', pattern.lower())
+    return frozenset(word for word in clean_pattern.split() if len(word) > 1)
+
+
+# 패턴 안전성 검사는 re의 내부 파서 모듈을 사용 - 공개 API가 아니어서 버전마다 모듈명/구조가 다름
+# (3.11부터 re._parser/re._constants), 사용할 수 없으면 check_pattern이 모든 패턴을 거부 (fail closed)
+try:
+    if sys.version_info >= (3, 11):
+        from re import _constants as _sre_constants, _parser as _sre_parser
+    else:
+        import sre_constants as _sre_constants, sre_parse as _sre_parser
+    _REPEAT_OPS = (_sre_constants.MAX_REPEAT, _sre_constants.MIN_REPEAT)
+    _ATOMIC_GROUP = getattr(_sre_constants, "ATOMIC_GROUP", None)  # 3.11+
+except (ImportError, AttributeError):
+    _sre_constants = _sre_parser = None
+    _REPEAT_OPS = ()
+    _ATOMIC_GROUP = None
+
+
+def _is_unbounded_repeat(item) -> bool:
+    op, av = item
+    return op in _REPEAT_OPS and av[1] == _sre_constants.MAXREPEAT
+
+
+def _has_nested_quantifier(parsed) -> bool:
+    r"""무제한 반복 본문이 (그룹을 벗기면) 곧바로 또 하나의 무제한 반복인 구조 탐지 - (a+)+, (?:\s*)*
+    
+    직접 중첩된 반복만 잡음. (a|a)*, (a|ab)*c 같은 분기 겹침이나 (\s*\w+)* 같은 인접 반복 겹침은
+    탐지하지 못하므로 이 검사를 통과했다고 백트래킹이 안전하다는 뜻은 아님.
+    """
+    for op, av in parsed:
+        if op in _REPEAT_OPS:
+            body = av[2]
+            # 그룹으로 감싼 경우 벗겨서 반복 본문이 단일 무제한 반복인지 확인
+            while len(body) == 1 and body[0][0] is _sre_constants.SUBPATTERN:
+                body = body[0][1][3]
+            if av[1] == _sre_constants.MAXREPEAT and len(body) == 1 and _is_unbounded_repeat(body[0]):
+                return True
+            children = [av[2]]
+        elif op is _sre_constants.SUBPATTERN:
+            children = [av[3]]
+        elif op is _sre_constants.BRANCH:
+            children = av[1]
+        elif op in (_sre_constants.ASSERT, _sre_constants.ASSERT_NOT):
+            children = [av[1]]
+        elif _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+            children = [av]
+        else:
+            continue
+        if any(_has_nested_quantifier(child) for child in children):
+            return True
+    return False
+
+
+def check_pattern(pattern: str):
+    """규칙 패턴 사전 검사 - 문법 오류나 직접 중첩된 무제한 반복이 있으면 re.error
+    
+    탐지 범위는 _has_nested_quantifier 참고. 내부 파서를 쓸 수 없거나 구문 트리 구조가 예상과 다르면
+    안전성을 확인할 수 없으므로 re.error로 거부함.
+    """
+    if _sre_parser is None:
+        raise re.error("regex parser internals unavailable - cannot verify pattern safety", pattern)
+    
+    # 컴파일과 같은 파서로 구문 트리만 만들어 검사 (문법 오류는 여기서 re.error)
+    parsed = _sre_parser.parse(pattern, RULE_FLAGS)
+    try:
+        nested = _has_nested_quantifier(parsed)
+    except (AttributeError, IndexError, TypeError, ValueError) as e:
+        raise re.error(f"unrecognized regex parse tree ({e!r}) - cannot verify pattern safety", pattern)
+    if nested:
+        raise re.error("nested unbounded quantifier (catastrophic backtracking risk)", pattern)
+
+
 class DSLRule:
     """단일 DSL 규칙"""
     
@@ -19,6 +107,9 @@ class DSLRule:
                  description: str = "", performance_score: float = 0.0):
         self.rule_id = rule_id
         self.rule_type = rule_type  # 'noise_removal', 'fact_extraction', 'legal_filtering'
+        self._keyword_set: Optional[FrozenSet[str]] = None
+        self._keyword_count = 0
+        self._compiled: Optional[re.Pattern] = None
         self.pattern = pattern
         self.replacement = replacement
         self.priority = priority  # 높을수록 먼저 실행
@@ -30,6 +121,44 @@ class DSLRule:
         self.usage_count = 0
         self.success_rate = 0.0
     
+    @property
+    def pattern(self) -> str:
+        return self._pattern
+    
+    @pattern.setter
+    def pattern(self, value: str):
+        # 패턴이 바뀌면 캐시된 키워드 집합과 컴파일된 정규식도 무효화
+        self._pattern = value
+        self._keyword_set = None
+        self._compiled = None
+    
+    @property
+    def compiled(self) -> re.Pattern:
+        """컴파일된 패턴 (최초 접근 시 컴파일 후 캐시, 잘못된 패턴이면 re.error)"""
+        if self._compiled is None:
+            self._compiled = re.compile(self._pattern, RULE_FLAGS)
+        return self._compiled
+    
+    @property
+    def keyword_set(self) -> FrozenSet[str]:
+        """패턴 키워드 집합 (최초 접근 시 계산 후 캐시)"""
+        if self._keyword_set is None:
+            self._keyword_set = pattern_keywords(self._pattern)
+            self._keyword_count = len(self._keyword_set)
+        return self._keyword_set
+    
+    @property
+    def keyword_count(self) -> int:
+        """패턴 키워드 수 (키워드 집합과 함께 캐시)"""
+        if self._keyword_set is None:
+            self.keyword_set
+        return self._keyword_count
+    
+    def validate(self):
+        """패턴을 미리 검사하고 컴파일해 검증 (잘못되었거나 백트래킹 위험이 큰 패턴이면 re.error)"""
+        check_pattern(self._pattern)
+        self.compiled
+    
     def apply(self, text: str) -> Tuple[str, bool]:
         """규칙을 텍스트에 적용"""
         if not self.enabled:
@@ -38,7 +167,7 @@ class DSLRule:
         try:
             if self.rule_type == 'noise_removal':
                 # 노이즈 제거 규칙
-                new_text = re.sub(self.pattern, self.replacement, text, flags=re.DOTALL | re.IGNORECASE | re.MULTILINE)
+                new_text = self.compiled.sub(self.replacement, text)
                 applied = new_text != text
                 
                 # 특정 규칙에 대해 상세 디버깅
@@ -51,20 +180,21 @@ class DSLRule:
                 applied = False
             elif self.rule_type == 'legal_filtering':
                 # 법리 필터링 규칙 (전체 텍스트에서 패턴 매칭 후 제거)
-                new_text = re.sub(self.pattern, self.replacement, text, flags=re.DOTALL | re.IGNORECASE | re.MULTILINE)
+                new_text = self.compiled.sub(self.replacement, text)
                 applied = new_text != text
             elif self.rule_type == 'post_normalize':
                 # 후처리 정규화 규칙 (공백, 줄바꿈 등)
-                new_text = re.sub(self.pattern, self.replacement, text, flags=re.DOTALL | re.IGNORECASE | re.MULTILINE)
+                new_text = self.compiled.sub(self.replacement, text)
                 applied = new_text != text
             else:
                 # 기본 치환 규칙
-                new_text = re.sub(self.pattern, self.replacement, text, flags=re.DOTALL | re.IGNORECASE | re.MULTILINE)
+                new_text = self.compiled.sub(self.replacement, text)
                 applied = new_text != text
             
             if applied:
-                self.usage_count += 1
-                self.updated_at = datetime.now().isoformat()
+                with _usage_lock:
+                    self.usage_count += 1
+                    self.updated_at = datetime.now().isoformat()
             
             return new_text, applied
         except Exception as e:
@@ -113,6 +243,12 @@ class DSLRuleManager:
     
     def __init__(self):
         self.rules: Dict[str, DSLRule] = {}
+        self._rules_by_type: Optional[Mapping[str, Tuple[DSLRule, ...]]] = None
+        self._rules_by_pattern: Optional[Dict[str, str]] = None
+        self._rules_by_type_pattern: Optional[Dict[Tuple[str, str], str]] = None
+        self._sorted_rules: Optional[Tuple[DSLRule, ...]] = None
+        # 정렬 캐시 생성과 무효화를 직렬화 - 무효화 전에 만들어진 목록이 무효화 뒤에 저장되지 않도록
+        self._index_lock = threading.Lock()
         self.version = "1.0.0"
         self.collection_name = "dsl_rules"
         self.load_rules()
@@ -136,6 +272,9 @@ class DSLRuleManager:
             logger.error(f"DSL 규칙 로드 실패: {e}")
             print(f"🔧 ERROR: DSL 규칙 로드 실패: {e}")
             self.rules = {}  # 실패시 빈 규칙 세트
+        finally:
+            # 규칙을 모두 바꾼 뒤에 무효화 (로드 중에 만들어진 인덱스가 남지 않도록)
+            self.invalidate_rule_index()
     
     def _load_from_mongodb(self) -> bool:
         """MongoDB에서 규칙 로드 (동기식 클라이언트 사용)"""
@@ -415,14 +554,14 @@ class DSLRuleManager:
             # 실패시 백업 복구
             self.rules = backup_rules
             logger.error(f"규칙 다시 로드 실패, 백업 복구: {e}")
+        finally:
+            # 규칙을 모두 바꾼 뒤에 무효화 (리로드 중에 만들어진 인덱스가 남지 않도록)
+            self.invalidate_rule_index()
     
     def _find_duplicate_rule(self, new_rule: DSLRule) -> Optional[DSLRule]:
         """중복 규칙 찾기 (동일한 패턴과 타입)"""
-        for existing_rule in self.rules.values():
-            if (existing_rule.rule_type == new_rule.rule_type and 
-                existing_rule.pattern == new_rule.pattern):
-                return existing_rule
-        return None
+        rule_id = self.rules_by_type_pattern.get((new_rule.rule_type, new_rule.pattern))
+        return self.rules.get(rule_id) if rule_id else None
     
     def add_rule(self, rule: DSLRule) -> bool:
         """규칙 추가 - 개별 규칙만 MongoDB에 추가/업데이트"""
@@ -440,6 +579,7 @@ class DSLRuleManager:
             
             # 메모리에 규칙 추가
             self.rules[rule.rule_id] = rule
+            self.invalidate_rule_index()
             print(f"🔧 DEBUG: 메모리에 규칙 추가 완료, 총 {len(self.rules)}개 규칙")
             
             # 개별 규칙만 MongoDB에 저장
@@ -468,6 +608,7 @@ class DSLRuleManager:
                 print(f"🔧 ERROR: MongoDB 저장 실패 (save_result={save_result}), 메모리에서 규칙 제거")
                 if rule.rule_id in self.rules:
                     del self.rules[rule.rule_id]  # 저장 실패시 메모리에서도 제거
+                    self.invalidate_rule_index()
                 return False
         except Exception as e:
             print(f"🔧 ERROR: 규칙 추가 실패 - {rule.rule_id}: {e}")
@@ -482,6 +623,8 @@ class DSLRuleManager:
                 for key, value in kwargs.items():
                     if hasattr(rule, key):
                         setattr(rule, key, value)
+                if 'rule_type' in kwargs or 'priority' in kwargs or 'pattern' in kwargs or 'enabled' in kwargs:
+                    self.invalidate_rule_index()
                 rule.updated_at = datetime.now().isoformat()
                 self.save_rules()
                 logger.info(f"규칙 업데이트: {rule_id}")
@@ -501,15 +644,65 @@ class DSLRuleManager:
         """규칙 활성화"""
         return self.update_rule(rule_id, enabled=True)
     
+    def invalidate_rule_index(self):
+        """규칙 목록이나 규칙 타입/우선순위/패턴/활성 여부가 바뀐 뒤에 호출 - 인덱스 재생성 예약"""
+        with self._index_lock:
+            self._rules_by_type = None
+            self._rules_by_pattern = None
+            self._rules_by_type_pattern = None
+            self._sorted_rules = None
+    
+    @property
+    def rules_by_type(self) -> Mapping[str, Tuple[DSLRule, ...]]:
+        """규칙 타입별 규칙 목록 (우선순위 내림차순, 비활성 규칙 포함) - 캐시된 인덱스이므로 읽기 전용 뷰로 반환"""
+        if self._rules_by_type is None:
+            rules_by_type: Dict[str, List[DSLRule]] = {}
+            for rule in sorted(self.rules.values(), key=lambda x: x.priority, reverse=True):
+                rules_by_type.setdefault(rule.rule_type, []).append(rule)
+            self._rules_by_type = MappingProxyType({
+                rule_type: tuple(rules) for rule_type, rules in rules_by_type.items()
+            })
+        return self._rules_by_type
+    
+    @property
+    def rules_by_pattern(self) -> Dict[str, str]:
+        """패턴 → 규칙 ID (같은 패턴이 여럿이면 먼저 등록된 규칙)"""
+        if self._rules_by_pattern is None:
+            self._build_pattern_index()
+        return self._rules_by_pattern
+    
+    @property
+    def rules_by_type_pattern(self) -> Dict[Tuple[str, str], str]:
+        """(규칙 타입, 패턴) → 규칙 ID (같은 키가 여럿이면 먼저 등록된 규칙)"""
+        if self._rules_by_type_pattern is None:
+            self._build_pattern_index()
+        return self._rules_by_type_pattern
+    
+    def _build_pattern_index(self):
+        """패턴 기반 인덱스 두 개를 규칙 한 번 순회로 생성"""
+        rules_by_pattern: Dict[str, str] = {}
+        rules_by_type_pattern: Dict[Tuple[str, str], str] = {}
+        for rule in self.rules.values():
+            rules_by_pattern.setdefault(rule.pattern, rule.rule_id)
+            rules_by_type_pattern.setdefault((rule.rule_type, rule.pattern), rule.rule_id)
+        self._rules_by_pattern = rules_by_pattern
+        self._rules_by_type_pattern = rules_by_type_pattern
+    
     def get_rules_by_type(self, rule_type: str) -> List[DSLRule]:
-        """타입별 규칙 조회"""
+        """타입별 활성 규칙 조회 (호출마다 새 목록)"""
         return [rule for rule in self.rules.values() 
                 if rule.rule_type == rule_type and rule.enabled]
     
-    def get_sorted_rules(self) -> List[DSLRule]:
-        """우선순위 순으로 정렬된 규칙 조회"""
-        return sorted([rule for rule in self.rules.values() if rule.enabled],
-                     key=lambda x: x.priority, reverse=True)
+    def get_sorted_rules(self) -> Tuple[DSLRule, ...]:
+        """우선순위 순으로 정렬된 활성 규칙 조회 (규칙이 바뀔 때까지 정렬 결과를 재사용하므로 튜플로 반환)"""
+        sorted_rules = self._sorted_rules
+        if sorted_rules is None:
+            with self._index_lock:
+                if self._sorted_rules is None:
+                    self._sorted_rules = tuple(sorted([rule for rule in list(self.rules.values()) if rule.enabled],
+                                                      key=lambda x: x.priority, reverse=True))
+                sorted_rules = self._sorted_rules
+        return sorted_rules
     
     def apply_rules(self, text: str, rule_types: Optional[List[str]] = None) -> Tuple[str, Dict[str, Any]]:
         """규칙들을 텍스트에 적용"""
@@ -531,7 +724,7 @@ class DSLRuleManager:
             rules_to_apply = self.get_sorted_rules()
         
         # 규칙 적용
-        print(f"🔍 DEBUG: 적용할 규칙 수: {len(rules_to_apply)}")
+        logger.debug("적용할 규칙 수: %d", len(rules_to_apply))
         for i, rule in enumerate(rules_to_apply):
             try:
                 old_length = len(result_text)
@@ -580,40 +773,35 @@ class DSLRuleManager:
     def get_performance_report(self) -> Dict[str, Any]:
         """성능 리포트 생성"""
         total_rules = len(self.rules)
-        enabled_rules = len([r for r in self.rules.values() if r.enabled])
-        disabled_rules = total_rules - enabled_rules
+        enabled_rules = 0
         
-        # 규칙 유형별 개수 계산 (UI에서 기대하는 형식)
-        rules_by_type = {}
+        # 규칙 유형별 상세 통계 (분석용) - 활성 규칙 수와 함께 규칙 한 번 순회로 집계
         type_stats = {}
         
         for rule in self.rules.values():
-            rule_type = rule.rule_type
-            
-            # 단순 개수 (UI용)
-            if rule_type not in rules_by_type:
-                rules_by_type[rule_type] = 0
-            rules_by_type[rule_type] += 1
-            
-            # 상세 통계 (분석용)
-            if rule_type not in type_stats:
-                type_stats[rule_type] = {
+            stats = type_stats.get(rule.rule_type)
+            if stats is None:
+                stats = type_stats[rule.rule_type] = {
                     'count': 0,
                     'enabled': 0,
                     'avg_usage': 0,
                     'avg_performance': 0
                 }
-            type_stats[rule_type]['count'] += 1
+            stats['count'] += 1
             if rule.enabled:
-                type_stats[rule_type]['enabled'] += 1
-            type_stats[rule_type]['avg_usage'] += rule.usage_count
-            type_stats[rule_type]['avg_performance'] += rule.performance_score
+                stats['enabled'] += 1
+                enabled_rules += 1
+            stats['avg_usage'] += rule.usage_count
+            stats['avg_performance'] += rule.performance_score
+        
+        disabled_rules = total_rules - enabled_rules
         
-        # 평균 계산
-        for stats in type_stats.values():
-            if stats['count'] > 0:
-                stats['avg_usage'] /= stats['count']
-                stats['avg_performance'] /= stats['count']
+        # 유형별 단순 개수 (UI에서 기대하는 형식) 및 평균 계산
+        rules_by_type = {}
+        for rule_type, stats in type_stats.items():
+            rules_by_type[rule_type] = stats['count']
+            stats['avg_usage'] /= stats['count']
+            stats['avg_performance'] /= stats['count']
         
         return {
             'version': self.version,
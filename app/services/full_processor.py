@@ -6,13 +6,13 @@ from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 import logging
 import math
+import time
 
 from app.models.document import (
-    BatchJob, DocumentCase, ProcessingResult, QualityMetrics,
-    ProcessingStatus, ProcessingMode
+    BatchJob, DocumentCase, ProcessingStatus, ProcessingMode
 )
 from app.core.config import settings
-from app.core.database import document_repo, result_repo, cache_manager
+from app.core.database import db_manager, document_repo, cache_manager
 from app.services.openai_service import OpenAIService
 from app.services.dsl_rules import dsl_manager
 
@@ -131,7 +131,7 @@ class FullProcessor:
             logger.info("Starting 1% dry run (1,600 cases)")
             
             dry_run_size = 1600
-            start_time = datetime.now()
+            start_ns = time.perf_counter_ns()
             
             # 샘플 선택
             sample_cases = await document_repo.get_stratified_sample({}, dry_run_size)
@@ -152,13 +152,12 @@ class FullProcessor:
             batches = [sample_cases[i:i + batch_size] for i in range(0, len(sample_cases), batch_size)]
             
             for batch in batches:
-                batch_start = datetime.now()
+                batch_start_ns = time.perf_counter_ns()
                 
                 # 병렬 처리
                 batch_results = await self._process_batch_parallel(batch)
                 
-                batch_end = datetime.now()
-                batch_time = (batch_end - batch_start).total_seconds()
+                batch_time = (time.perf_counter_ns() - batch_start_ns) / 1e9
                 total_processing_time += batch_time
                 
                 # 결과 집계
@@ -168,8 +167,7 @@ class FullProcessor:
                     else:
                         failed_count += 1
             
-            end_time = datetime.now()
-            total_duration = (end_time - start_time).total_seconds()
+            total_duration = (time.perf_counter_ns() - start_ns) / 1e9
             
             # 성능 지표 계산
             avg_processing_time_per_case = total_processing_time / len(sample_cases)
@@ -355,33 +353,43 @@ class FullProcessor:
         batch_cases: List[Dict[str, Any]], 
         max_concurrent: int
     ) -> List[Dict[str, Any]]:
-        """동시성 제어하며 배치 처리"""
+        """동시성 제어하며 배치 처리
         
-        semaphore = asyncio.Semaphore(max_concurrent)
+        배치 전체의 코루틴을 한꺼번에 만들지 않고 실행 중인 태스크를 max_concurrent개로 유지하며,
+        끝난 태스크부터 결과를 수거 (결과는 입력 순서대로 반환)
+        """
         
-        async def process_single_case_with_semaphore(case_data):
-            async with semaphore:
-                return await self._process_single_case_full(case_data)
+        processed_results: List[Optional[Dict[str, Any]]] = [None] * len(batch_cases)
+        pending: Dict[asyncio.Task, int] = {}
+        next_index = 0
         
-        # 병렬 처리
-        tasks = [
-            process_single_case_with_semaphore(case_data)
-            for case_data in batch_cases
-        ]
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # 예외 처리
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    "case_id": batch_cases[i].get("case_id", f"unknown_{i}"),
-                    "success": False,
-                    "error": str(result)
-                })
-            else:
-                processed_results.append(result)
+        try:
+            while pending or next_index < len(batch_cases):
+                # 동시 실행 한도까지 채우기
+                while next_index < len(batch_cases) and len(pending) < max_concurrent:
+                    task = asyncio.create_task(self._process_single_case_full(batch_cases[next_index]))
+                    pending[task] = next_index
+                    next_index += 1
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    i = pending.pop(task)
+                    # 개별 케이스 태스크만 취소된 경우 exception()이 CancelledError를 던지므로 먼저 확인
+                    error = "case task cancelled" if task.cancelled() else task.exception()
+                    if error is not None:
+                        processed_results[i] = {
+                            "case_id": batch_cases[i].get("case_id", f"unknown_{i}"),
+                            "success": False,
+                            "error": str(error)
+                        }
+                    else:
+                        processed_results[i] = task.result()
+        finally:
+            # 작업이 취소되면(gather와 같이) 실행 중인 케이스 태스크도 취소하고 종료를 기다림
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
         
         return processed_results
     
@@ -389,7 +397,7 @@ class FullProcessor:
         """단일 케이스 전량 처리"""
         
         try:
-            start_time = datetime.now()
+            start_ns = time.perf_counter_ns()
             
             # 메타데이터 준비
             metadata = {
@@ -400,25 +408,25 @@ class FullProcessor:
             }
             
             # DSL 규칙 적용
+            case_id = str(case_data["_id"])
             original_content = case_data.get("content", "")
             processed_content, rule_results = dsl_manager.apply_rules(original_content)
             applied_rules = [result['rule_id'] for result in rule_results['applied_rules']]
             
-            end_time = datetime.now()
-            processing_time_ms = int((end_time - start_time).total_seconds() * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
-            # 토큰 수 계산
-            token_count_before = self.openai_service.calculate_token_count(original_content)
-            token_count_after = self.openai_service.calculate_token_count(processed_content)
+            # 토큰 수 계산 (정수로 한 번만 변환해 저장/반환에 같이 사용)
+            token_count_before = int(self.openai_service.calculate_token_count(original_content))
+            token_count_after = int(self.openai_service.calculate_token_count(processed_content))
             
             # cases 컬렉션에 전량 처리 결과 저장
             try:
-                from app.core.database import db_manager
                 cases_collection = db_manager.get_collection("cases")
                 
                 if cases_collection is not None:
+                    now = datetime.now().isoformat()
                     case_result = {
-                        "original_id": str(case_data["_id"]),
+                        "original_id": case_id,
                         "precedent_id": case_data.get("precedent_id", ""),
                         "case_name": case_data.get("case_name", ""),
                         "case_number": case_data.get("case_number", ""),
@@ -430,34 +438,33 @@ class FullProcessor:
                         "rules_version": self._get_current_rules_version(),
                         "processing_mode": "full",
                         "processing_time_ms": processing_time_ms,
-                        "token_count_before": int(token_count_before),
-                        "token_count_after": int(token_count_after),
-                        "token_reduction_percent": ((int(token_count_before) - int(token_count_after)) / int(token_count_before) * 100) if int(token_count_before) > 0 else 0,
+                        "token_count_before": token_count_before,
+                        "token_count_after": token_count_after,
+                        "token_reduction_percent": ((token_count_before - token_count_after) / token_count_before * 100) if token_count_before > 0 else 0,
                         "applied_rules": applied_rules,
                         "status": "completed",
-                        "created_at": datetime.now().isoformat(),
-                        "updated_at": datetime.now().isoformat()
+                        "created_at": now,
+                        "updated_at": now
                     }
                     
                     await cases_collection.update_one(
-                        {"original_id": str(case_data["_id"])},
+                        {"original_id": case_id},
                         {"$set": case_result},
                         upsert=True
                     )
                     
-                    logger.info(f"Saved full processing result for case {case_data.get('_id')}")
+                    logger.info(f"Saved full processing result for case {case_id}")
             except Exception as save_error:
                 logger.error(f"Failed to save full processing result: {save_error}")
             
+            # 본문은 cases 컬렉션에 저장했으므로 결과에는 싣지 않음 (배치 결과가 본문을 붙잡지 않도록)
             return {
-                "case_id": str(case_data["_id"]),
+                "case_id": case_id,
                 "success": True,
-                "before_content": original_content,
-                "after_content": processed_content,
                 "applied_rules": applied_rules,
                 "processing_time_ms": processing_time_ms,
-                "token_count_before": int(token_count_before),
-                "token_count_after": int(token_count_after),
+                "token_count_before": token_count_before,
+                "token_count_after": token_count_after,
                 "metadata": metadata
             }
             
@@ -470,36 +477,12 @@ class FullProcessor:
             }
     
     async def _save_batch_results(self, batch_results: List[Dict[str, Any]]):
-        """배치 결과 저장 - 이미 개별 케이스 처리에서 cases 컬렉션에 저장했으므로 통계만 업데이트"""
+        """배치 결과 집계 - 케이스별 결과(본문 포함)는 _process_single_case_full에서 cases 컬렉션에 이미 저장됨"""
         
-        # 통계 목적으로만 사용 - 실제 저장은 _process_single_case_full에서 이미 완료
         success_count = sum(1 for result in batch_results if result.get("success", False))
         failure_count = len(batch_results) - success_count
         
         logger.info(f"Batch results: {success_count} successes, {failure_count} failures")
-        
-        # 필요시 processing_results 컬렉션에 메타데이터 저장
-        try:
-            for result in batch_results:
-                if result["success"]:
-                    processing_result = ProcessingResult(
-                        case_id=result["case_id"],
-                        rules_version=self._get_current_rules_version(),
-                        metrics=QualityMetrics(nrr=0, fpr=0, ss=0, token_reduction=0),  # 전량 처리에서는 평가 생략
-                        before_content=result["before_content"],
-                        after_content=result["after_content"],
-                        diff_summary="",
-                        processing_time_ms=result["processing_time_ms"],
-                        token_count_before=result["token_count_before"],
-                        token_count_after=result["token_count_after"],
-                        errors=[],
-                        warnings=[]
-                    )
-                    
-                    await result_repo.save_result(processing_result.dict())
-                    
-        except Exception as e:
-            logger.error(f"Failed to save processing results metadata: {e}")
     
     def _update_processing_stats(self, batch_results: List[Dict[str, Any]]):
         """처리 통계 업데이트"""
@@ -594,7 +577,7 @@ class FullProcessor:
                 estimated_completion = (datetime.now() + timedelta(minutes=remaining_minutes)).strftime("%H:%M")
         
         return {
-            "status": self.current_job.status.value if self.current_job.status else "unknown",
+            "status": ProcessingStatus(self.current_job.status).value if self.current_job.status else "unknown",
             "processed_count": total_processed,
             "total_count": total_cases,
             "progress_percentage": round(progress_percentage, 1),
@@ -663,7 +646,6 @@ class FullProcessor:
     async def _get_batch_cases(self, offset: int, batch_size: int) -> List[Dict[str, Any]]:
         """배치 케이스 가져오기 (processed_precedents에서)"""
         try:
-            from app.core.database import db_manager
             collection = db_manager.get_collection("processed_precedents")
             
             if collection is None:
@@ -694,7 +676,6 @@ class FullProcessor:
     def _get_current_rules_version(self) -> str:
         """현재 DSL 규칙 버전 가져오기"""
         try:
-            from app.services.dsl_rules import dsl_manager
             return dsl_manager.version
         except Exception as e:
             logger.warning(f"규칙 버전 로드 실패: {e}")
@@ -3,7 +3,9 @@ OpenAI API 서비스
 """
 import asyncio
 import json
+import re
 from typing import Dict, List, Any, Optional, Tuple
+import httpx
 import openai
 from app.core.config import settings
 from app.models.document import QualityMetrics
@@ -15,10 +17,15 @@ logger = logging.getLogger(__name__)
 class OpenAIService:
     """OpenAI API 서비스"""
     
-    def __init__(self):
-        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
+    def __init__(self, http_client: Optional[httpx.AsyncClient] = None):
+        # http_client를 넘기면 호출자가 연결 풀 크기를 정함 (없으면 SDK 기본 클라이언트)
+        self.client = openai.AsyncOpenAI(api_key=settings.openai_api_key, http_client=http_client)
         self.model = settings.openai_model
     
+    async def aclose(self):
+        """API 클라이언트와 연결 풀 종료"""
+        await self.client.close()
+    
     async def evaluate_single_case(
         self, 
         before_content: str, 
@@ -109,6 +116,73 @@ class OpenAIService:
             logger.error(f"Failed to evaluate batch cases: {e}")
             raise
     
+    async def _make_api_call(
+        self,
+        prompt: str,
+        system_prompt: str = "당신은 문서 전처리 규칙 개선 전문가입니다.",
+        temperature: float = 0.3,
+        max_tokens: int = 2000
+    ) -> str:
+        """단일 프롬프트로 채팅 완성 API 호출 후 응답 텍스트 반환"""
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.choices[0].message.content or ""
+    
+    async def submit_batch(
+        self,
+        prompts: Dict[str, str],
+        system_prompt: str = "당신은 문서 전처리 규칙 개선 전문가입니다.",
+        temperature: float = 0.3,
+        max_tokens: int = 2000
+    ) -> Dict[str, str]:
+        """여러 프롬프트를 Batch API 작업 하나로 제출하고 완료 후 custom_id별 응답 텍스트 반환"""
+        batch_requests = [
+            {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": prompt}
+                    ],
+                    "temperature": temperature,
+                    "max_tokens": max_tokens
+                }
+            }
+            for custom_id, prompt in prompts.items()
+        ]
+        
+        batch_file = await self._create_batch_file(batch_requests)
+        batch = await self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
+        )
+        batch_result = await self._wait_for_batch_completion(batch.id)
+        
+        responses: Dict[str, str] = {}
+        if batch_result.output_file_id:
+            output_file = await self.client.files.content(batch_result.output_file_id)
+            for line in output_file.read().decode().splitlines():
+                try:
+                    result_data = json.loads(line)
+                    responses[result_data["custom_id"]] = (
+                        result_data["response"]["body"]["choices"][0]["message"]["content"] or ""
+                    )
+                except Exception as e:
+                    logger.warning(f"Failed to parse batch result line: {e}")
+        
+        return responses
+    
     async def generate_improvement_suggestions(
         self, 
         failure_patterns: List[Dict[str, Any]]
@@ -341,15 +415,14 @@ class OpenAIService:
                 # 정규식 패턴에서 백슬래시를 이중 백슬래시로 변환
                 fixed_json_text = json_text
                 # pattern_before와 pattern_after 필드에서 이스케이프 문자 수정
-                import re as regex_module
-                pattern_fields = regex_module.findall(r'"pattern_before":\s*"([^"]*)"', fixed_json_text)
+                pattern_fields = re.findall(r'"pattern_before":\s*"([^"]*)"', fixed_json_text)
                 for pattern in pattern_fields:
                     if '\\' in pattern and not '\\\\' in pattern:
                         # 단일 백슬래시를 이중 백슬래시로 변경
                         fixed_pattern = pattern.replace('\\', '\\\\')
                         fixed_json_text = fixed_json_text.replace(f'"pattern_before": "{pattern}"', f'"pattern_before": "{fixed_pattern}"')
                 
-                pattern_after_fields = regex_module.findall(r'"pattern_after":\s*"([^"]*)"', fixed_json_text)
+                pattern_after_fields = re.findall(r'"pattern_after":\s*"([^"]*)"', fixed_json_text)
                 for pattern in pattern_after_fields:
                     if '\\' in pattern and not '\\\\' in pattern:
                         # 단일 백슬래시를 이중 백슬래시로 변경
@@ -386,7 +459,9 @@ class OpenAIService:
             logger.error(f"Failed to parse evaluation result: {e}")
             logger.error(f"Raw result text: {result_text}")
             # 기본값 반환
-            metrics = QualityMetrics(nrr=0.0, fpr=0.0, ss=0.0, token_reduction=0.0)
+            metrics = QualityMetrics.model_construct(
+                nrr=0.0, fpr=0.0, ss=0.0, token_reduction=0.0, parsing_errors=0
+            )
             return metrics, [f"파싱 오류: {str(e)}"], []
     
     def _parse_improvement_suggestion(
@@ -467,7 +542,7 @@ class OpenAIService:
         batch_result: Any, 
         original_cases: List[Dict[str, Any]]
     ) -> List[Tuple[str, QualityMetrics, List[str], str]]:
-        """배치 결과 파싱"""
+        """배치 결과 파싱 (custom_id는 eval_{case_id}_{원본 케이스 인덱스})"""
         
         results = []
         
@@ -481,25 +556,20 @@ class OpenAIService:
                     result_data = json.loads(line)
                     custom_id = result_data["custom_id"]
                     
-                    # case_id 추출
-                    case_id = custom_id.split('_')[1]
+                    # 원본 케이스는 custom_id 끝의 인덱스로 바로 찾음 (케이스 목록을 줄마다 훑지 않고,
+                    # 밑줄이 들어간 case_id도 그대로 유지)
+                    original_case = original_cases[int(custom_id.rpartition('_')[2])]
+                    case_id = original_case["case_id"]
                     
-                    # 원본 케이스 찾기
-                    original_case = next(
-                        (case for case in original_cases if case["case_id"] == case_id), 
-                        None
+                    response_content = result_data["response"]["body"]["choices"][0]["message"]["content"]
+                    
+                    metrics, errors, suggestions = self._parse_evaluation_result(
+                        response_content,
+                        original_case["before_content"],
+                        original_case["after_content"]
                     )
                     
-                    if original_case:
-                        response_content = result_data["response"]["body"]["choices"][0]["message"]["content"]
-                        
-                        metrics, errors, suggestions = self._parse_evaluation_result(
-                            response_content,
-                            original_case["before_content"],
-                            original_case["after_content"]
-                        )
-                        
-                        results.append((case_id, metrics, errors, suggestions))
+                    results.append((case_id, metrics, errors, suggestions))
                         
                 except Exception as e:
                     logger.warning(f"Failed to parse batch result line: {e}")
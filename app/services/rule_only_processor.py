@@ -2,6 +2,7 @@
 규칙 전용 처리기 - AI 평가 없이 기본 규칙만으로 전처리
 """
 import asyncio
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import logging
@@ -49,7 +50,6 @@ class RuleOnlyProcessor:
             logger.info("count_documents 호출 시작")
             try:
                 # 타임아웃을 설정하여 무한 대기 방지
-                import asyncio
                 total_count = await asyncio.wait_for(
                     source_collection.count_documents({}), 
                     timeout=30.0  # 30초 타임아웃
@@ -261,7 +261,7 @@ class RuleOnlyProcessor:
     async def test_processing(self, limit: int = 10) -> Dict[str, Any]:
         """테스트용 소량 처리"""
         try:
-            start_time = datetime.now()
+            start_ns = time.perf_counter_ns()
             print(f"🧪 규칙 전용 테스트 처리 시작 - {limit}개 문서")
             
             # MongoDB 컬렉션 연결
@@ -358,7 +358,7 @@ class RuleOnlyProcessor:
             # 통계 계산
             processed_count = len(results)
             avg_reduction_rate = total_reduction / processed_count if processed_count > 0 else 0.0
-            processing_time_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
             
             print(f"✅ 테스트 완료: {processed_count}개 처리, 평균 압축률: {avg_reduction_rate:.1f}%")
             
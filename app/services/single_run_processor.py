@@ -2,6 +2,7 @@
 단건 점검 모드 (Shakedown) 처리기
 """
 import asyncio
+import time
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import logging
@@ -14,7 +15,7 @@ from app.core.config import settings, processing_mode, quality_gates
 from app.core.database import document_repo, result_repo, cache_manager
 # RulesVersionManager 제거됨 - 필요시 DSLRuleManager에서 버전 관리
 from app.services.openai_service import OpenAIService
-from app.services.dsl_rules import dsl_manager
+from app.services.dsl_rules import DSLRule, dsl_manager
 from app.services.safety_gates import safety_gate_manager
 
 logger = logging.getLogger(__name__)
@@ -88,7 +89,7 @@ class SingleRunProcessor:
     
     async def _execute_preprocessing(self, case_data: Dict[str, Any]) -> Dict[str, Any]:
         """전처리 실행"""
-        start_time = datetime.now()
+        start_ns = time.perf_counter_ns()
         
         # 케이스 메타데이터 준비
         metadata = {
@@ -103,8 +104,7 @@ class SingleRunProcessor:
         processed_content, rule_results = dsl_manager.apply_rules(original_content)
         applied_rules = [result['rule_id'] for result in rule_results['applied_rules']]
         
-        end_time = datetime.now()
-        processing_time_ms = int((end_time - start_time).total_seconds() * 1000)
+        processing_time_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
         
         # 토큰 수 계산
         token_count_before = self.openai_service.calculate_token_count(original_content)
@@ -148,14 +148,14 @@ class SingleRunProcessor:
     
     async def _check_quality_gates(self, evaluation_result: Dict[str, Any]) -> Dict[str, Any]:
         """품질 게이트 확인"""
-        metrics = evaluation_result["metrics"]
+        # 품질 지표 확인 (지표 dict는 한 번만 만들어 세 검사에서 공유)
+        metrics = evaluation_result["metrics"].model_dump()
         
-        # 품질 지표 확인
-        quality_check = quality_gates.check_quality_metrics(metrics.dict())
-        is_passing = quality_gates.is_passing(metrics.dict())
+        quality_check = quality_gates.check_quality_metrics(metrics)
+        is_passing = quality_gates.is_passing(metrics)
         
         if not is_passing:
-            failing_metrics = quality_gates.get_failing_metrics(metrics.dict())
+            failing_metrics = quality_gates.get_failing_metrics(metrics)
             logger.warning(f"Quality gate failed for case {evaluation_result['case_id']}: {failing_metrics}")
         
         return {
@@ -188,7 +188,7 @@ class SingleRunProcessor:
             warnings=[]
         )
         
-        await result_repo.save_result(result_data.dict())
+        await result_repo.save_result(result_data.model_dump())
         
         # 결과에 따른 처리
         if gate_result["passed"]:
@@ -200,7 +200,7 @@ class SingleRunProcessor:
             "case_id": case_id,
             "status": "completed",
             "passed": gate_result["passed"],
-            "metrics": evaluation_result["metrics"].dict(),
+            "metrics": evaluation_result["metrics"].model_dump(),
             "diff_summary": evaluation_result["diff_summary"],
             "errors": evaluation_result["errors"],
             "suggestions": evaluation_result["suggestions"],
@@ -259,7 +259,7 @@ class SingleRunProcessor:
             "case_id": case_id,
             "failure_type": "quality_gate_failure",
             "errors": evaluation_result["errors"],
-            "metrics": evaluation_result["metrics"].dict(),
+            "metrics": evaluation_result["metrics"].model_dump(),
             "content_snippet": evaluation_result["after_content"][:500],
             "added_at": datetime.now()
         }
@@ -298,8 +298,6 @@ class SingleRunProcessor:
         """패치 제안 적용 (DSLRuleManager 사용)"""
         try:
             # DSLRuleManager를 통해 직접 규칙 추가
-            from app.services.dsl_rules import DSLRule
-            
             new_rule = DSLRule(
                 rule_id=f"auto_patch_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 rule_type=suggestion.get('rule_type', 'noise_removal'),
@@ -327,7 +325,6 @@ class SingleRunProcessor:
     def _get_current_rules_version(self) -> str:
         """현재 DSL 규칙 버전 가져오기"""
         try:
-            from app.services.dsl_rules import dsl_manager
             return dsl_manager.version
         except Exception as e:
             logger.warning(f"규칙 버전 로드 실패: {e}")
@@ -43,4 +43,8 @@ $PYTHON_CMD -m pip install --no-cache-dir -r requirements.txt
 # Create necessary directories
 mkdir -p logs
 
+# Pre-compress static assets (served as-is by PrecompressedStaticFiles)
+echo "Pre-compressing static assets..."
+find app/ui/static -type f \( -name '*.css' -o -name '*.js' \) -exec gzip -9 -k -f {} \;
+
 echo "Build completed successfully with Python $($PYTHON_CMD -c "import sys; print(f'{sys.version_info.major}.{sys.version_info.minor}')")"
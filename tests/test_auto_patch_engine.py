@@ -0,0 +1,132 @@
+"""
+자동 패치 엔진 테스트
+"""
+import pytest
+
+import app.services.auto_patch_engine as auto_patch_engine_module
+from app.services.auto_patch_engine import AutoPatchEngine, PatchSuggestion
+from app.services.dsl_rules import DSLRule, DSLRuleManager
+
+
+def _make_engine(monkeypatch, *rules):
+    # MongoDB 없이 메모리 규칙만으로 구성한 규칙 관리자를 엔진이 쓰도록 교체
+    monkeypatch.setattr(DSLRuleManager, "load_rules", lambda self: None)
+    monkeypatch.setattr(DSLRuleManager, "save_rules", lambda self: None)
+    monkeypatch.setattr(DSLRuleManager, "_save_single_rule_to_mongodb", lambda self, rule: True)
+    monkeypatch.setattr(DSLRuleManager, "_reload_all_rules", lambda self: None)
+    manager = DSLRuleManager()
+    for rule in rules:
+        manager.rules[rule.rule_id] = rule
+    manager.invalidate_rule_index()
+    monkeypatch.setattr(auto_patch_engine_module, "dsl_manager", manager)
+    return AutoPatchEngine(), manager
+
+
+def _make_patch(suggestion_id, rule_type="new_pattern", pattern_after=r"광고\s*문구"):
+    return PatchSuggestion(
+        suggestion_id=suggestion_id,
+        description="테스트 패치",
+        confidence_score=0.9,
+        rule_type=rule_type,
+        estimated_improvement="",
+        applicable_cases=["general"],
+        pattern_before="",
+        pattern_after=pattern_after,
+    )
+
+
+def test_parse_enhancement_response_reads_fenced_json():
+    response = '설명\n```json\n{"suggestions": [{"description": "a"}]}\n```\n끝'
+    assert AutoPatchEngine()._parse_enhancement_response(response) == [{"description": "a"}]
+
+
+def test_parse_enhancement_response_reads_brace_span():
+    response = '결과: {"suggestions": [{"description": "a"}]} 입니다'
+    assert AutoPatchEngine()._parse_enhancement_response(response) == [{"description": "a"}]
+
+
+def test_parse_enhancement_response_ignores_trailing_prose_with_braces():
+    # 마지막 '}'까지 자르면 깨지는 응답 - 첫 객체만 디코딩 (문자열 안의 중괄호 포함)
+    response = '{"suggestions": [{"after": "\\\\d{2,3}"}]}\n참고: {예시} 형식'
+    assert AutoPatchEngine()._parse_enhancement_response(response) == [{"after": "\\d{2,3}"}]
+
+
+@pytest.mark.parametrize("response", ["", "JSON 없음", "{깨진 JSON}", '```json\n{"a": \n```'])
+def test_parse_enhancement_response_returns_empty_on_invalid_input(response):
+    assert AutoPatchEngine()._parse_enhancement_response(response) == []
+
+
+def test_calculate_pattern_similarity_is_jaccard():
+    engine = AutoPatchEngine()
+    keywords1 = frozenset({"aa", "bb", "cc"})
+    keywords2 = frozenset({"bb", "cc", "dd", "ee"})
+    assert engine._calculate_pattern_similarity(keywords1, keywords2, 3, 4) == pytest.approx(2 / 5)
+    assert engine._calculate_pattern_similarity(keywords2, keywords1, 4, 3) == pytest.approx(2 / 5)
+    assert engine._calculate_pattern_similarity(frozenset(), keywords1, 0, 3) == 0.0
+
+
+def test_is_duplicate_pattern_detects_similar_enabled_rule(monkeypatch):
+    rule = DSLRule("r1", "noise_removal", "alpha beta gamma delta epsilon")
+    engine, _ = _make_engine(monkeypatch, rule)
+    # 키워드 6개 중 5개 공유 - Jaccard 5/6 > 0.8
+    assert engine._is_duplicate_pattern("alpha beta gamma delta epsilon zeta", "noise_removal")
+    # 다른 타입의 규칙과는 비교하지 않음
+    assert not engine._is_duplicate_pattern("alpha beta gamma delta epsilon zeta", "legal_filtering")
+
+
+def test_is_duplicate_pattern_skips_rules_outside_count_window(monkeypatch):
+    # 키워드 수가 (0.8n, n/0.8) 범위 밖인 규칙은 비교 대상에서 제외
+    small = DSLRule("small", "noise_removal", "alpha beta gamma")
+    large = DSLRule("large", "noise_removal", "alpha beta gamma delta epsilon zeta eta theta")
+    engine, _ = _make_engine(monkeypatch, small, large)
+    calls = []
+    original = engine._calculate_pattern_similarity
+
+    def spy(keywords1, keywords2, count1, count2):
+        calls.append(count2)
+        return original(keywords1, keywords2, count1, count2)
+
+    monkeypatch.setattr(engine, "_calculate_pattern_similarity", spy)
+    assert not engine._is_duplicate_pattern("alpha beta gamma delta epsilon", "noise_removal")
+    assert calls == []
+
+
+def test_is_duplicate_pattern_ignores_disabled_rules(monkeypatch):
+    rule = DSLRule("r1", "noise_removal", "alpha beta gamma delta epsilon", enabled=False)
+    engine, _ = _make_engine(monkeypatch, rule)
+    assert not engine._is_duplicate_pattern("alpha beta gamma delta epsilon", "noise_removal")
+
+
+def test_rollback_disables_only_rules_added_by_patch(monkeypatch):
+    existing = DSLRule("existing", "noise_removal", r"기존\s*규칙")
+    engine, manager = _make_engine(monkeypatch, existing)
+
+    success, _ = engine.apply_patch(_make_patch("p1"))
+    assert success
+    assert engine.get_patch_history()[-1]["rule_ids"] == ["ai_new_p1"]
+
+    success, _ = engine.rollback_patch("p1")
+    assert success
+    assert not manager.rules["ai_new_p1"].enabled
+    assert manager.rules["existing"].enabled
+
+
+def test_rollback_fails_when_patch_added_no_rules(monkeypatch):
+    # 이미 같은 규칙이 있으면 추가 없이 성공하므로 롤백할 규칙이 없음
+    existing = DSLRule("existing", "noise_removal", r"광고\s*문구")
+    engine, manager = _make_engine(monkeypatch, existing)
+
+    success, _ = engine.apply_patch(_make_patch("p1"))
+    assert success
+
+    success, message = engine.rollback_patch("p1")
+    assert not success
+    assert "관련 규칙을 찾을 수 없습니다" in message
+    assert manager.rules["existing"].enabled
+
+
+def test_rollback_unknown_patch(monkeypatch):
+    engine, _ = _make_engine(monkeypatch)
+    success, message = engine.rollback_patch("missing")
+    assert not success
+    assert "패치 기록을 찾을 수 없습니다" in message
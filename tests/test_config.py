@@ -0,0 +1,46 @@
+"""
+처리 모드 설정 테스트
+"""
+from types import SimpleNamespace
+
+from app.core.config import ProcessingMode
+
+
+def _make_settings(**overrides):
+    values = dict(
+        single_run_mode=True, use_batch_api=False, auto_patch=True, auto_advance=False,
+        min_nrr=0.92, min_fpr=0.985, min_ss=0.9, min_token_reduction=0.2,
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_processing_mode_caches_mode_until_invalidated():
+    settings = _make_settings()
+    mode = ProcessingMode(settings)
+    assert mode.get_mode_name() == "단건 점검 모드 (Shakedown)"
+    assert mode.get_mode_config()["single_run_mode"] is True
+
+    # 런타임 토글 변경은 invalidate 전까지 캐시된 값에 반영되지 않음
+    settings.single_run_mode = False
+    settings.use_batch_api = True
+    assert mode.get_mode_name() == "단건 점검 모드 (Shakedown)"
+
+    mode.invalidate()
+    assert mode.get_mode_name() == "Batch API 반복 개선"
+    config = mode.get_mode_config()
+    assert config["mode"] == "Batch API 반복 개선"
+    assert config["single_run_mode"] is False
+    assert config["use_batch_api"] is True
+
+
+def test_processing_mode_invalidate_rebuilds_mode_config():
+    settings = _make_settings(single_run_mode=False)
+    mode = ProcessingMode(settings)
+    assert mode.get_mode_config()["mode"] == "전량 처리 모드"
+
+    settings.min_nrr = 0.95
+    assert mode.get_mode_config()["quality_gates"]["min_nrr"] == 0.92
+
+    mode.invalidate()
+    assert mode.get_mode_config()["quality_gates"]["min_nrr"] == 0.95
@@ -0,0 +1,115 @@
+"""
+데이터베이스 유틸리티 테스트
+"""
+import asyncio
+import types
+
+import app.core.database as database
+from app.core.database import RulesRepository, _allocate_strata
+
+
+class _FakeRulesCollection:
+    """find_one/insert_one 호출 수를 세는 rules_versions 컬렉션 대역"""
+    
+    def __init__(self, documents):
+        self.documents = documents
+        self.find_calls = 0
+    
+    async def find_one(self, query=None, sort=None):
+        self.find_calls += 1
+        if query:
+            return next((dict(doc) for doc in self.documents if doc["version"] == query["version"]), None)
+        return dict(max(self.documents, key=lambda doc: doc["created_at"]))
+    
+    async def insert_one(self, document):
+        self.documents.append(document)
+        return types.SimpleNamespace(inserted_id=len(self.documents))
+
+
+class _FakeDBManager:
+    def __init__(self, collection):
+        self.collection = collection
+    
+    def get_collection(self, name):
+        return self.collection
+
+
+def _make_rules_repo(monkeypatch, documents):
+    clock = types.SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(database, "time", types.SimpleNamespace(monotonic=lambda: clock.now))
+    collection = _FakeRulesCollection(documents)
+    return RulesRepository(_FakeDBManager(collection)), collection, clock
+
+
+def test_allocate_strata_sums_to_sample_size():
+    allocation = _allocate_strata([50, 30, 20], 10)
+    assert allocation == [5, 3, 2]
+    
+    # 나누어떨어지지 않으면 소수부가 큰 층부터 1개씩 더 배분
+    allocation = _allocate_strata([7, 7, 7], 10)
+    assert sum(allocation) == 10
+    assert sorted(allocation) == [3, 3, 4]
+
+
+def test_allocate_strata_never_exceeds_stratum_size():
+    sizes = [1000, 2, 1]
+    allocation = _allocate_strata(sizes, 500)
+    assert sum(allocation) == 500
+    assert all(count <= size for count, size in zip(allocation, sizes))
+
+
+def test_allocate_strata_caps_at_total_when_sample_size_is_larger():
+    sizes = [3, 5, 2]
+    assert _allocate_strata(sizes, 100) == sizes
+
+
+def test_allocate_strata_zero_count_strata():
+    assert _allocate_strata([0, 10, 0], 4) == [0, 4, 0]
+    assert _allocate_strata([0, 0], 5) == [0, 0]
+    assert _allocate_strata([4, 6], 0) == [0, 0]
+
+
+def test_latest_version_cache_expires_after_ttl(monkeypatch):
+    repo, collection, clock = _make_rules_repo(monkeypatch, [{"version": "v1", "created_at": 1}])
+    
+    async def scenario():
+        await repo.get_latest_version()
+        clock.now += 29
+        await repo.get_latest_version()
+        assert collection.find_calls == 1
+        
+        clock.now += 2
+        await repo.get_latest_version()
+        assert collection.find_calls == 2
+    
+    asyncio.run(scenario())
+
+
+def test_save_version_invalidates_latest_cache(monkeypatch):
+    repo, collection, clock = _make_rules_repo(monkeypatch, [{"version": "v1", "created_at": 1}])
+    
+    async def scenario():
+        assert (await repo.get_latest_version())["version"] == "v1"
+        await repo.save_version({"version": "v2", "created_at": 2})
+        assert (await repo.get_latest_version())["version"] == "v2"
+        assert collection.find_calls == 2
+    
+    asyncio.run(scenario())
+
+
+def test_cached_versions_are_returned_as_copies(monkeypatch):
+    repo, collection, clock = _make_rules_repo(
+        monkeypatch, [{"version": "v1", "created_at": 1, "rules": [{"rule_id": "a"}]}]
+    )
+    
+    async def scenario():
+        latest = await repo.get_latest_version()
+        latest["rules"].append({"rule_id": "b"})
+        assert (await repo.get_latest_version())["rules"] == [{"rule_id": "a"}]
+        
+        version = await repo.get_version("v1")
+        version["rules"].clear()
+        assert (await repo.get_version("v1"))["rules"] == [{"rule_id": "a"}]
+        assert collection.find_calls == 2
+    
+    asyncio.run(scenario())
@@ -0,0 +1,111 @@
+"""
+DSL 규칙 테스트
+"""
+import re
+
+import pytest
+
+import app.services.dsl_rules as dsl_rules
+from app.services.dsl_rules import DSLRule, DSLRuleManager, check_pattern
+
+
+def _make_manager(monkeypatch, *rules):
+    # MongoDB 없이 메모리 규칙만으로 구성
+    monkeypatch.setattr(DSLRuleManager, "load_rules", lambda self: None)
+    manager = DSLRuleManager()
+    for rule in rules:
+        manager.rules[rule.rule_id] = rule
+    manager.invalidate_rule_index()
+    return manager
+
+
+@pytest.mark.parametrize("pattern", [
+    r"(a+)+",
+    r"(a*)*",
+    r"(?:\s*)*",
+    r"((ab)*)+",
+    r"x(?:(?:\d+))+y",
+    r"(?=(a+)+)b",
+    r"foo|(?:r+)*",
+])
+def test_check_pattern_rejects_directly_nested_quantifiers(pattern):
+    with pytest.raises(re.error, match="nested unbounded quantifier"):
+        check_pattern(pattern)
+
+
+@pytest.mark.parametrize("pattern", [
+    r"a+b+",
+    r"(ab)+",
+    r"\d{1,3}",
+    r"(a+){2}",
+    r"(a{1,5})+",
+    r"【[^】]*】",
+    r"PDF로\s*보기",
+])
+def test_check_pattern_accepts_safe_patterns(pattern):
+    check_pattern(pattern)
+
+
+def test_check_pattern_rejects_syntax_errors():
+    with pytest.raises(re.error):
+        check_pattern(r"(unclosed")
+
+
+# 직접 중첩된 반복만 탐지함 - 아래는 알려진 미탐지 사례 (탐지하게 되면 strict xfail이 실패해 알려줌)
+@pytest.mark.xfail(strict=True, reason="분기/인접 반복 겹침은 탐지하지 않음")
+@pytest.mark.parametrize("pattern", [
+    r"(a|a)*",
+    r"(a|ab)*c",
+    r"(\s*\w+)*",
+])
+def test_check_pattern_known_gaps(pattern):
+    with pytest.raises(re.error):
+        check_pattern(pattern)
+
+
+def test_check_pattern_fails_closed_without_parser(monkeypatch):
+    monkeypatch.setattr(dsl_rules, "_sre_parser", None)
+    with pytest.raises(re.error, match="cannot verify"):
+        check_pattern(r"a+b")
+
+
+def test_check_pattern_fails_closed_on_unexpected_parse_tree(monkeypatch):
+    class _DriftedParser:
+        @staticmethod
+        def parse(pattern, flags):
+            return [(dsl_rules._sre_constants.MAX_REPEAT, ("unexpected",))]
+    
+    monkeypatch.setattr(dsl_rules, "_sre_parser", _DriftedParser)
+    with pytest.raises(re.error, match="cannot verify"):
+        check_pattern(r"a+")
+
+
+def test_cached_rule_indexes_are_read_only(monkeypatch):
+    manager = _make_manager(
+        monkeypatch,
+        DSLRule("low", "noise_removal", "a", priority=1),
+        DSLRule("high", "noise_removal", "b", priority=9),
+        DSLRule("off", "noise_removal", "c", priority=5, enabled=False),
+    )
+    
+    sorted_rules = manager.get_sorted_rules()
+    assert [rule.rule_id for rule in sorted_rules] == ["high", "low"]
+    assert isinstance(sorted_rules, tuple)
+    assert manager.get_sorted_rules() is sorted_rules
+    
+    by_type = manager.rules_by_type
+    assert [rule.rule_id for rule in by_type["noise_removal"]] == ["high", "off", "low"]
+    with pytest.raises(TypeError):
+        by_type["noise_removal"] = ()
+    with pytest.raises(AttributeError):
+        by_type["noise_removal"].append(DSLRule("x", "noise_removal", "x"))
+
+
+def test_rule_indexes_rebuild_after_invalidation(monkeypatch):
+    manager = _make_manager(monkeypatch, DSLRule("a", "noise_removal", "a", priority=1))
+    before = manager.get_sorted_rules()
+    
+    manager.rules["b"] = DSLRule("b", "noise_removal", "b", priority=2)
+    manager.invalidate_rule_index()
+    assert [rule.rule_id for rule in manager.get_sorted_rules()] == ["b", "a"]
+    assert [rule.rule_id for rule in before] == ["a"]
@@ -0,0 +1,70 @@
+"""
+로깅 핸들러 테스트
+"""
+import logging
+
+import orjson
+
+import app.core.logging as app_logging
+from app.core.logging import JSONFormatter, _BufferedRotatingFileHandler
+
+
+def _make_handler(path, max_bytes, backup_count=1):
+    handler = _BufferedRotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    return handler
+
+
+def _emit(handler, count):
+    for i in range(count):
+        handler.handle(logging.makeLogRecord({"msg": f"record {i:04d}"}))
+
+
+def test_buffered_handler_combines_writes(tmp_path, monkeypatch):
+    # 주기적 flush가 끼어들지 않도록 간격을 충분히 늘림
+    monkeypatch.setattr(app_logging, "_LOG_FLUSH_INTERVAL", 3600)
+    path = tmp_path / "app.log"
+    handler = _make_handler(path, max_bytes=10 * 1024 * 1024)
+    try:
+        _emit(handler, 100)
+        # 회전 검사가 버퍼를 비우지 않으므로 아직 디스크에 기록되지 않아야 함
+        assert path.stat().st_size == 0
+        
+        handler.force_flush()
+        assert path.read_text().splitlines() == [f"record {i:04d}" for i in range(100)]
+    finally:
+        handler.close()
+
+
+def test_buffered_handler_rolls_over_by_byte_count(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_logging, "_LOG_FLUSH_INTERVAL", 3600)
+    path = tmp_path / "app.log"
+    record_size = len("record 0000\n")
+    handler = _make_handler(path, max_bytes=record_size * 10, backup_count=3)
+    try:
+        _emit(handler, 25)
+        handler.force_flush()
+    finally:
+        handler.close()
+    
+    files = [path, tmp_path / "app.log.1", tmp_path / "app.log.2"]
+    assert all(f.stat().st_size < record_size * 10 for f in files)
+    lines = [line for f in reversed(files) for line in f.read_text().splitlines()]
+    assert lines == [f"record {i:04d}" for i in range(25)]
+
+
+def test_json_formatter_renames_extra_fields_that_collide_with_prefix():
+    record = logging.makeLogRecord({
+        "msg": "hello",
+        "extra_fields": {"host": "db-1", "pid": 7, "job_id": "j1"}
+    })
+    line = JSONFormatter().format(record)
+    
+    # 중복 키는 파서가 앞쪽 값을 조용히 버리므로 원문에서 직접 확인
+    assert line.count('"host":') == 1
+    assert line.count('"pid":') == 1
+    entry = orjson.loads(line)
+    assert entry["host"] != "db-1"
+    assert entry["extra_host"] == "db-1"
+    assert entry["extra_pid"] == 7
+    assert entry["job_id"] == "j1"
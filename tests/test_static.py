@@ -0,0 +1,58 @@
+"""
+정적 파일 서빙 테스트
+"""
+import gzip
+
+import pytest
+
+from app.core.static import PrecompressedStaticFiles
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    (tmp_path / "app.js").write_text("console.log('hello');")
+    (tmp_path / "app.js.gz").write_bytes(gzip.compress(b"console.log('hello');"))
+    (tmp_path / "plain.css").write_text("body {}")
+    return tmp_path
+
+
+def _file_response(static_dir, name, accept_encoding=None, extra_headers=()):
+    static_files = PrecompressedStaticFiles(directory=str(static_dir))
+    headers = list(extra_headers)
+    if accept_encoding is not None:
+        headers.append((b"accept-encoding", accept_encoding.encode()))
+    scope = {"type": "http", "method": "GET", "path": f"/{name}", "headers": headers}
+    full_path = str(static_dir / name)
+    return static_files.file_response(full_path, (static_dir / name).stat(), scope)
+
+
+def test_serves_gzip_file_when_client_accepts_gzip(static_dir):
+    response = _file_response(static_dir, "app.js", "gzip, deflate, br")
+    assert response.path == str(static_dir / "app.js.gz")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    # Content-Type은 압축본이 아닌 원본 파일 기준
+    assert response.media_type in ("text/javascript", "application/javascript")
+
+
+def test_serves_original_file_without_gzip_support(static_dir):
+    response = _file_response(static_dir, "app.js")
+    assert response.path == str(static_dir / "app.js")
+    assert "content-encoding" not in response.headers
+
+    response = _file_response(static_dir, "app.js", "br")
+    assert response.path == str(static_dir / "app.js")
+
+
+def test_serves_original_file_when_gzip_file_missing(static_dir):
+    response = _file_response(static_dir, "plain.css", "gzip")
+    assert response.path == str(static_dir / "plain.css")
+    assert "content-encoding" not in response.headers
+
+
+def test_gzip_response_honours_conditional_request(static_dir):
+    etag = _file_response(static_dir, "app.js", "gzip").headers["etag"]
+    response = _file_response(
+        static_dir, "app.js", "gzip", extra_headers=[(b"if-none-match", etag.encode())]
+    )
+    assert response.status_code == 304